@@ -9,31 +9,62 @@ License: MIT
 """
 
 import asyncio
+import atexit
+import copy
+import functools
 import logging
-import signal
+import queue
 import sys
+import time
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 
 from aiogram import Bot, Dispatcher
 from aiogram.enums import ParseMode
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.types import ErrorEvent
 
+try:
+    import uvloop
+except ImportError:  # Windows or uvloop not installed
+    uvloop = None
+
+try:
+    import orjson
+except ImportError:  # orjson not installed, stdlib json is used
+    orjson = None
+
 from config import config
-from handlers import admin_router, common_router, callbacks_router
-from handlers.fsm_handlers import router as fsm_router
-from handlers.admin import set_bot_start_time, update_last_post_status
-from services.scheduler import start_scheduler, stop_scheduler
-from services.post_service import post_to_channel
-from services.user_service import ensure_data_file_exists
 from utils.logger import mask_channel_id, mask_user_id
 
-# Configure logging
+
+class _DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves traceback formatting to the listener thread."""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args now: they may be mutable (e.g. post data) and change
+        # before the listener runs; exc_info is only rendered later
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+# Configure logging: handlers only enqueue records, a background thread writes them
+_stdout_handler = logging.StreamHandler(sys.stdout)
+_stdout_handler.setFormatter(
+    logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+)
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, _stdout_handler, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     handlers=[
-        logging.StreamHandler(sys.stdout)
+        _DeferredQueueHandler(_log_queue)
     ]
 )
 
@@ -46,27 +77,34 @@ logging.getLogger("httpx").setLevel(logging.WARNING)
 
 logger = logging.getLogger(__name__)
 
-# Global bot instance for scheduler access
-bot_instance: Bot = None
+# Connection pool for Telegram Bot API requests: enough sockets for bursts of
+# answer/edit calls, reused between updates to avoid repeated TLS handshakes
+TELEGRAM_POOL_LIMIT = 200
+
+# Set once on_shutdown has released resources, so a repeated call is a no-op
+_already_shut = False
 
 
-async def scheduled_morning_post() -> None:
+async def scheduled_morning_post(bot: Bot) -> None:
     """
     Scheduled job function for morning posts.
-    Called by APScheduler at configured time.
+    Called by APScheduler at configured time (bot is bound in on_startup).
     Posts DIRECTLY to channel without preview (scheduled posts).
     """
-    global bot_instance
+    from handlers.admin import update_last_post_status
+    from services.post_service import channel_post_sem, post_to_channel
     
     logger.info("=== Starting scheduled morning post ===")
     
     try:
-        # preview_mode=False for scheduled posts - publish directly
-        success, _ = await post_to_channel(
-            bot=bot_instance, 
-            channel_id=config.channel_id,
-            preview_mode=False  # Direct publish for scheduler
-        )
+        # preview_mode=False for scheduled posts - publish directly, waiting
+        # for any manual publish that is already running
+        async with channel_post_sem:
+            success, _ = await post_to_channel(
+                bot=bot,
+                channel_id=config.channel_id,
+                preview_mode=False  # Direct publish for scheduler
+            )
         update_last_post_status(success=success)
         
         if success:
@@ -75,7 +113,7 @@ async def scheduled_morning_post() -> None:
             logger.error("=== Scheduled post failed ===")
             
     except Exception as e:
-        logger.error(f"=== Scheduled post error: {e} ===", exc_info=True)
+        logger.error("=== Scheduled post error: %s ===", e, exc_info=True)
         update_last_post_status(success=False, error=str(e))
 
 
@@ -84,76 +122,113 @@ async def on_startup(bot: Bot) -> None:
     Called when bot starts.
     Initializes scheduler, user data file, and logs startup info.
     """
-    global bot_instance
-    bot_instance = bot
+    from handlers.admin import set_bot_start_time
+    from services.scheduler import start_scheduler
+    from services.user_service import ensure_data_file_exists, start_activity_worker
     
-    # Ensure user data file exists
-    ensure_data_file_exists()
+    # Set bot start time for uptime tracking
+    set_bot_start_time(time.monotonic())
+    now = datetime.now()
+    
+    # Ensure user data file exists (off the loop, overlapped with get_me below)
+    init_task = asyncio.create_task(asyncio.to_thread(ensure_data_file_exists))
     
     logger.info("=" * 50)
     logger.info("🤖 Utro Bot starting...")
-    logger.info(f"📅 Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    logger.info(f"📢 Channel ID: {mask_channel_id(config.channel_id, config.debug_mode)}")
-    logger.info(f"🕐 Timezone: {config.timezone}")
-    logger.info(f"⏰ Morning post time: {config.morning_post_time}")
-    logger.info(f"👤 Admin users: {len(config.admin_user_ids)}")
-    logger.info(f"🎉 Holidays API: {'✅ Configured' if config.holidays_api_key else '❌ Not configured'}")
+    logger.info("📅 Timestamp: %s", now.strftime('%Y-%m-%d %H:%M:%S'))
+    logger.info("📢 Channel ID: %s", mask_channel_id(config.channel_id, config.debug_mode))
+    logger.info("🕐 Timezone: %s", config.timezone)
+    logger.info("⏰ Morning post time: %s", config.morning_post_time)
+    logger.info("👤 Admin users: %d", len(config.admin_user_ids))
+    logger.info("🎉 Holidays API: %s", '✅ Configured' if config.holidays_api_key else '❌ Not configured')
     logger.info("=" * 50)
     
-    # Set bot start time for uptime tracking
-    set_bot_start_time(datetime.now())
+    # Start background writer for user activity
+    start_activity_worker()
     
     # Start the scheduler
-    start_scheduler(scheduled_morning_post)
+    start_scheduler(functools.partial(scheduled_morning_post, bot))
     logger.info("✅ Scheduler started successfully")
     
     # Get bot info
     try:
         bot_info = await bot.get_me()
-        logger.info(f"🤖 Bot username: @{bot_info.username}")
-        logger.info(f"🆔 Bot ID: {mask_user_id(bot_info.id, config.debug_mode)}")
+        logger.info("🤖 Bot username: @%s", bot_info.username)
+        logger.info("🆔 Bot ID: %s", mask_user_id(bot_info.id, config.debug_mode))
     except Exception as e:
-        logger.warning(f"Could not get bot info: {e}")
+        logger.warning("Could not get bot info: %s", e)
+    
+    await init_task
 
 
 async def on_shutdown(bot: Bot) -> None:
     """
     Called when bot shuts down.
     Stops scheduler and cleans up resources.
+    Safe to call more than once.
     """
+    global _already_shut
+    if _already_shut:
+        return
+    _already_shut = True
+    
+    from services.scheduler import stop_scheduler
+    from services.http_session import close_http_session
+    from services.user_service import stop_activity_worker
+    from services.ai_content import close_openai_client as close_text_client
+    from services.image_generator import close_openai_client as close_image_client
+    
     logger.info("=" * 50)
     logger.info("🛑 Shutting down Utro Bot...")
-    logger.info(f"📅 Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    logger.info("📅 Timestamp: %s", datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
     
     # Stop the scheduler
     stop_scheduler()
     logger.info("✅ Scheduler stopped")
     
+    # Flush pending user activity writes
+    await stop_activity_worker()
+    
     # Close bot session
     await bot.session.close()
     logger.info("✅ Bot session closed")
     
+    # Close shared HTTP session and OpenAI clients used by API services
+    await close_http_session()
+    await close_text_client()
+    await close_image_client()
+    logger.info("✅ API clients closed")
+    
     logger.info("🛑 Bot shutdown complete")
     logger.info("=" * 50)
 
 
-def handle_signal(sig, frame):
-    """Handle termination signals for graceful shutdown."""
-    logger.info(f"Received signal {sig}, initiating shutdown...")
-    sys.exit(0)
-
-
 async def main() -> None:
     """
     Main function - entry point for the bot.
     Sets up bot, dispatcher, handlers, error handler, and starts polling.
     """
+    from handlers import admin_router, common_router, callbacks_router
+    from handlers.fsm_handlers import router as fsm_router
+    from handlers.middlewares import ConcurrencyLimitMiddleware
+    
     # Validate configuration
     logger.info("Validating configuration...")
     
+    # Pooled aiohttp session for Bot API calls
+    session_kwargs = {}
+    if orjson is not None:
+        # C-accelerated (de)serialization of Bot API payloads
+        session_kwargs.update(
+            json_loads=orjson.loads,
+            json_dumps=lambda obj: orjson.dumps(obj).decode()
+        )
+    session = AiohttpSession(limit=TELEGRAM_POOL_LIMIT, **session_kwargs)
+    
     # Create bot instance with default properties
     bot = Bot(
         token=config.bot_token,
+        session=session,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML)
     )
     
@@ -168,7 +243,8 @@ async def main() -> None:
         Logs the error and prevents bot crash.
         """
         logger.error(
-            f"Error handling update: {event.exception}",
+            "Error handling update: %s",
+            event.exception,
             exc_info=event.exception
         )
         
@@ -185,11 +261,14 @@ async def main() -> None:
                     show_alert=True
                 )
         except Exception as notify_error:
-            logger.error(f"Could not notify user about error: {notify_error}")
+            logger.error("Could not notify user about error: %s", notify_error)
         
         # Return True to prevent the error from propagating
         return True
     
+    # Bound the number of updates processed at once
+    dp.update.outer_middleware(ConcurrencyLimitMiddleware(config.max_concurrency))
+    
     # Register routers (order matters - FSM first, then callbacks before common for catch-all)
     dp.include_router(fsm_router)
     dp.include_router(admin_router)
@@ -201,35 +280,38 @@ async def main() -> None:
     dp.startup.register(on_startup)
     dp.shutdown.register(on_shutdown)
     
-    # Set up signal handlers for graceful shutdown
-    signal.signal(signal.SIGINT, handle_signal)
-    signal.signal(signal.SIGTERM, handle_signal)
-    
     try:
         logger.info("Starting bot polling...")
         
         # Delete webhook before polling (in case it was set)
         await bot.delete_webhook(drop_pending_updates=True)
         
-        # Start polling
+        # Start long polling (Telegram holds getUpdates open up to the timeout).
+        # handle_signals installs SIGINT/SIGTERM handlers on the running loop
+        # that stop polling, so the dispatcher's shutdown hooks always run.
         await dp.start_polling(
             bot,
+            polling_timeout=25,
+            handle_as_tasks=True,
+            handle_signals=True,
             allowed_updates=dp.resolve_used_update_types(),
             close_bot_session=False
         )
         
     except Exception as e:
-        logger.error(f"Bot polling error: {e}", exc_info=True)
+        logger.error("Bot polling error: %s", e, exc_info=True)
         raise
-    finally:
-        await on_shutdown(bot)
 
 
 if __name__ == "__main__":
+    # Use libuv-based event loop when available (faster socket I/O and timers)
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
     except Exception as e:
-        logger.error(f"Fatal error: {e}", exc_info=True)
+        logger.error("Fatal error: %s", e, exc_info=True)
         sys.exit(1)
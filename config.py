@@ -6,7 +6,7 @@ Loads environment variables and provides typed configuration.
 import os
 import logging
 from dataclasses import dataclass, field
-from typing import List
+from typing import FrozenSet
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -35,7 +35,7 @@ class Config:
     channel_id: str = field(default_factory=lambda: os.getenv("CHANNEL_ID", ""))
     
     # Admin User IDs (comma-separated)
-    admin_user_ids: List[int] = field(default_factory=list)
+    admin_user_ids: FrozenSet[int] = field(default_factory=frozenset)
     
     # Timezone for scheduling (default: Moscow)
     timezone: str = field(default_factory=lambda: os.getenv("TIMEZONE", "Europe/Moscow"))
@@ -46,22 +46,53 @@ class Config:
     # Debug mode - if True, sensitive data won't be masked in logs
     debug_mode: bool = field(default_factory=lambda: os.getenv("DEBUG_MODE", "false").lower() == "true")
     
+    # Cache holiday API results in memory (set to 0 to always hit the API)
+    holidays_caching_enabled: bool = field(
+        default_factory=lambda: os.getenv("HOLIDAYS_CACHING_ENABLED", "true").lower() in ("1", "true", "yes")
+    )
+    
+    # Maximum number of updates handled concurrently
+    max_concurrency: int = field(default_factory=lambda: int(os.getenv("MAX_CONCURRENCY", "16")))
+    
+    # Maximum number of image/recipe generations run at the same time
+    max_concurrent_generations: int = field(
+        default_factory=lambda: int(os.getenv("MAX_CONCURRENT_GENERATIONS", "3"))
+    )
+    
+    # Parsed components of morning_post_time (filled in __post_init__)
+    _post_hour: int = field(default=8, init=False, repr=False)
+    _post_minute: int = field(default=0, init=False, repr=False)
+    
+    # First ID listed in ADMIN_USER_IDS (sets are unordered)
+    _primary_admin_id: int = field(default=0, init=False, repr=False)
+    
     def __post_init__(self):
         """Parse complex configuration values after initialization."""
         # Parse admin user IDs from comma-separated string
         admin_ids_str = os.getenv("ADMIN_USER_IDS", "")
         if admin_ids_str:
             try:
-                self.admin_user_ids = [int(uid.strip()) for uid in admin_ids_str.split(",") if uid.strip()]
+                ids = [int(uid.strip()) for uid in admin_ids_str.split(",") if uid.strip()]
+                self.admin_user_ids = frozenset(ids)
+                self._primary_admin_id = ids[0] if ids else 0
             except ValueError as e:
                 logger.error(f"Error parsing ADMIN_USER_IDS: {e}")
-                self.admin_user_ids = []
+                self.admin_user_ids = frozenset()
+        
+        # Parse morning post time once instead of on every access
+        try:
+            hour_str, minute_str = self.morning_post_time.split(":")
+            self._post_hour = int(hour_str)
+            self._post_minute = int(minute_str)
+        except ValueError as e:
+            logger.error(f"Error parsing MORNING_POST_TIME '{self.morning_post_time}': {e}")
+            self._post_hour, self._post_minute = 8, 0
         
         # Validate required configuration
         self._validate()
     
     def _validate(self) -> None:
-        """Validate that all required configuration is present."""
+        """Validate that required configuration is present and limits are sane."""
         errors = []
         
         if not self.bot_token:
@@ -73,6 +104,12 @@ class Config:
         if not self.channel_id:
             errors.append("CHANNEL_ID is required")
         
+        if self.max_concurrency < 1:
+            errors.append("MAX_CONCURRENCY must be at least 1")
+        
+        if self.max_concurrent_generations < 1:
+            errors.append("MAX_CONCURRENT_GENERATIONS must be at least 1")
+        
         if not self.holidays_api_key:
             logger.warning("HOLIDAYS_API_KEY not set - will use fallback holiday generation")
         
@@ -82,21 +119,15 @@ class Config:
         if errors:
             for error in errors:
                 logger.error(f"Configuration error: {error}")
-            raise ValueError(f"Missing required configuration: {', '.join(errors)}")
+            raise ValueError(f"Invalid configuration: {', '.join(errors)}")
     
     def get_post_hour(self) -> int:
         """Get the hour component of morning post time."""
-        try:
-            return int(self.morning_post_time.split(":")[0])
-        except (ValueError, IndexError):
-            return 8
+        return self._post_hour
     
     def get_post_minute(self) -> int:
         """Get the minute component of morning post time."""
-        try:
-            return int(self.morning_post_time.split(":")[1])
-        except (ValueError, IndexError):
-            return 0
+        return self._post_minute
     
     def is_admin(self, user_id: int) -> bool:
         """Check if user ID is in admin list."""
@@ -105,7 +136,7 @@ class Config:
     @property
     def admin_id(self) -> int:
         """Get the first admin ID (primary admin)."""
-        return self.admin_user_ids[0] if self.admin_user_ids else 0
+        return self._primary_admin_id
 
 
 # Global configuration instance
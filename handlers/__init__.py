@@ -1,10 +1,26 @@
 """
 Handlers package for the Utro Bot.
 Contains admin, common, and callback handlers.
+
+Routers are resolved lazily (PEP 562) so importing a single handler
+module does not pull in the whole handler tree.
 """
 
-from .admin import router as admin_router
-from .common import router as common_router
-from .callbacks import router as callbacks_router
+import importlib
+
+_ROUTER_MODULES = {
+    "admin_router": ".admin",
+    "common_router": ".common",
+    "callbacks_router": ".callbacks",
+}
 
 __all__ = ["admin_router", "common_router", "callbacks_router"]
+
+
+def __getattr__(name: str):
+    """Import the router's module on first access."""
+    if name in _ROUTER_MODULES:
+        router = importlib.import_module(_ROUTER_MODULES[name], __name__).router
+        globals()[name] = router
+        return router
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,8 +4,11 @@ Handles /post_now, /status, /test_holidays commands.
 All handlers check authorization first.
 """
 
+import asyncio
 import logging
-from datetime import datetime
+import time
+from datetime import date, datetime, timedelta
+from typing import NamedTuple, Optional
 from aiogram import Router, Bot
 from aiogram.types import Message
 from aiogram.filters import Command
@@ -13,46 +16,106 @@ from aiogram.filters import Command
 from config import config
 from keyboards import main_menu_keyboard
 from services.holidays_api import fetch_holidays_for_date
-from services.post_service import post_to_channel
-from services.user_service import update_user_activity, increment_posts_triggered
+from services.post_service import channel_post_sem, post_to_channel
+from services.settings_service import get_settings, get_image_model_info
+from services.user_service import track_user_activity, track_posts_triggered
+from utils.logger import mask_user_id
+from utils.throttle import denial_throttle
 
 logger = logging.getLogger(__name__)
 router = Router(name="admin")
 
-# Bot start time for uptime calculation
-bot_start_time: datetime = datetime.now()
-last_post_status: dict = {"success": None, "time": None, "error": None}
+# Admin IDs frozenset, bound once for O(1) checks on the hot path
+_ADMINS = config.admin_user_ids
 
+# Debug mode is fixed at startup; bound once for the mask_user_id() log calls
+_DEBUG_MODE = config.debug_mode
 
-def set_bot_start_time(start_time: datetime) -> None:
-    """Set the bot start time for uptime calculation."""
+# Static message texts (built once at import)
+_ACCESS_DENIED_TEXT = (
+    "❌ <b>У вас нет доступа к боту</b>\n\n"
+    "Этот бот доступен только для администраторов."
+)
+
+_ADMIN_HELP = """
+🔐 <b>Админ-команды</b>
+
+<b>Команды:</b>
+/post_now — Отправить пост прямо сейчас
+/status — Статус бота и следующий пост
+/test_holidays — Проверить API праздников
+/admin — Эта справка
+
+<b>Кнопки меню:</b>
+📨 Пост сейчас — отправить пост
+📊 Статус — информация о боте
+⚙️ Настройки — тесты и настройки
+ℹ️ Помощь — справка
+
+<b>Горячие советы:</b>
+• Используйте кнопки меню для удобства
+• Проверяйте логи: <code>journalctl -u utro-bot -f</code>
+• Перезапуск: <code>systemctl restart utro-bot</code>
+"""
+
+_STATUS_TEMPLATE = """
+📊 <b>Статус бота</b>
+
+<b>📅 Автопост:</b> {post_time} (МСК)
+<b>⏳ Через:</b> {hours_until}ч {minutes_until}м
+
+<b>📤 Последний пост:</b> {last_post_result}
+
+<b>⚙️ Настройки:</b>
+• 🖼 Изображения: {img_status}
+• 🎨 Модель: {model_name}
+• 📝 Шаблон: {template}
+"""
+
+# Bot start time for uptime calculation (monotonic clock, immune to wall-clock jumps)
+bot_start_time: float = time.monotonic()
+
+
+class PostStatus(NamedTuple):
+    """Result of the most recent channel post."""
+    success: Optional[bool]
+    time: Optional[datetime]
+    error: Optional[str]
+
+
+last_post_status = PostStatus(success=None, time=None, error=None)
+
+# Running /post_now generation (one at a time; also keeps the task referenced)
+_active_post_task: Optional[asyncio.Task] = None
+
+
+def set_bot_start_time(start_time: float) -> None:
+    """Set the bot start time (time.monotonic() value) for uptime calculation."""
     global bot_start_time
     bot_start_time = start_time
 
 
+def get_uptime() -> timedelta:
+    """Get time elapsed since bot start."""
+    return timedelta(seconds=int(time.monotonic() - bot_start_time))
+
+
 def update_last_post_status(success: bool, error: str = None) -> None:
     """Update the last post status."""
     global last_post_status
-    last_post_status = {
-        "success": success,
-        "time": datetime.now(),
-        "error": error
-    }
-
-
-def is_admin(user_id: int) -> bool:
-    """Check if user is an admin."""
-    return config.is_admin(user_id)
+    last_post_status = PostStatus(success=success, time=datetime.now(), error=error)
 
 
 async def send_access_denied(message: Message) -> None:
-    """Send access denied message to unauthorized users."""
-    await message.answer(
-        "❌ <b>У вас нет доступа к боту</b>\n\n"
-        "Этот бот доступен только для администраторов.",
-        parse_mode="HTML"
-    )
-    logger.warning(f"Unauthorized access attempt from user {message.from_user.id}")
+    """
+    Send access denied message to unauthorized users (once per minute per user).
+    Shared with handlers.common.
+    """
+    if not denial_throttle.allow(message.from_user.id):
+        return
+    await message.answer(_ACCESS_DENIED_TEXT, parse_mode="HTML")
+    if logger.isEnabledFor(logging.WARNING):
+        logger.warning("Unauthorized access attempt from %s", mask_user_id(message.from_user.id, _DEBUG_MODE))
 
 
 @router.message(Command("post_now"))
@@ -61,32 +124,55 @@ async def cmd_post_now(message: Message, bot: Bot) -> None:
     Handle /post_now command - trigger immediate post to channel.
     Admin only.
     """
+    global _active_post_task
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await send_access_denied(message)
         return
     
     try:
-        update_user_activity(
+        track_user_activity(
             user_id=user_id,
             first_name=message.from_user.first_name,
             username=message.from_user.username,
             action="/post_now"
         )
         
+        if _active_post_task is not None and not _active_post_task.done():
+            await message.answer(
+                "⏳ Пост уже генерируется, дождитесь завершения.",
+                reply_markup=main_menu_keyboard()
+            )
+            return
+        
         await message.answer(
             "⏳ Генерирую и отправляю пост в канал...\n\nЭто может занять 1-2 минуты.",
             reply_markup=main_menu_keyboard()
         )
-        logger.info(f"Admin {user_id} triggered manual post")
+        logger.info("Admin %s triggered manual post", user_id)
         
-        # Trigger post
-        success = await post_to_channel(bot, config.channel_id)
+        # Generate in the background so the handler doesn't hold an update slot
+        _active_post_task = asyncio.create_task(_run_manual_post(message, bot))
+            
+    except Exception as e:
+        logger.error("Error in cmd_post_now: %s", e, exc_info=True)
+        update_last_post_status(success=False, error=str(e))
+        await message.answer(
+            f"❌ Произошла ошибка: {str(e)[:200]}",
+            reply_markup=main_menu_keyboard()
+        )
+
+
+async def _run_manual_post(message: Message, bot: Bot) -> None:
+    """Publish a post for /post_now and report the result to the admin."""
+    try:
+        async with channel_post_sem:
+            success, _ = await post_to_channel(bot, config.channel_id)
         
         if success:
             update_last_post_status(success=True)
-            increment_posts_triggered(user_id)
+            track_posts_triggered(message.from_user.id)
             await message.answer(
                 "✅ Пост успешно опубликован в канал!",
                 reply_markup=main_menu_keyboard()
@@ -101,7 +187,7 @@ async def cmd_post_now(message: Message, bot: Bot) -> None:
             logger.error("Manual post failed")
             
     except Exception as e:
-        logger.error(f"Error in cmd_post_now: {e}", exc_info=True)
+        logger.error("Error in manual post: %s", e, exc_info=True)
         update_last_post_status(success=False, error=str(e))
         await message.answer(
             f"❌ Произошла ошибка: {str(e)[:200]}",
@@ -117,12 +203,14 @@ async def cmd_status(message: Message) -> None:
     """
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await send_access_denied(message)
         return
     
     try:
-        update_user_activity(
+        now = datetime.now()
+        
+        track_user_activity(
             user_id=user_id,
             first_name=message.from_user.first_name,
             username=message.from_user.username,
@@ -130,63 +218,58 @@ async def cmd_status(message: Message) -> None:
         )
         
         # Calculate uptime
-        uptime = datetime.now() - bot_start_time
+        uptime = get_uptime()
         days = uptime.days
         hours, remainder = divmod(uptime.seconds, 3600)
         minutes, seconds = divmod(remainder, 60)
         uptime_str = f"{days}д {hours}ч {minutes}м {seconds}с"
         
         # Next post time
-        now = datetime.now()
         post_hour = config.get_post_hour()
         post_minute = config.get_post_minute()
         
         next_post = now.replace(hour=post_hour, minute=post_minute, second=0, microsecond=0)
         if next_post <= now:
-            next_post = next_post.replace(day=next_post.day + 1)
+            next_post += timedelta(days=1)
         
         time_until = next_post - now
         hours_until, remainder = divmod(time_until.seconds, 3600)
         minutes_until, _ = divmod(remainder, 60)
         
         # Last post status
-        if last_post_status["time"]:
-            last_post_time = last_post_status["time"].strftime("%d.%m.%Y %H:%M:%S")
-            last_post_result = "✅ Успешно" if last_post_status["success"] else f"❌ Ошибка"
-            if last_post_status["error"]:
-                last_post_result += f"\n   └ {last_post_status['error'][:100]}"
+        status = last_post_status
+        if status.time:
+            last_post_time = status.time.strftime("%d.%m.%Y %H:%M:%S")
+            last_post_result = "✅ Успешно" if status.success else f"❌ Ошибка"
+            if status.error:
+                last_post_result += f"\n   └ {status.error[:100]}"
         else:
             last_post_time = "—"
             last_post_result = "—"
         
         # Settings status
-        from services.settings_service import get_settings, ImageModel
         settings = get_settings()
         img_status = "вкл" if settings.image_enabled else "выкл"
-        model_name = "DALL-E 3" if settings.image_model == ImageModel.DALLE3.value else "Flux"
+        model_name, _ = get_image_model_info(settings.image_model)
         
-        status_text = f"""
-📊 <b>Статус бота</b>
-
-<b>📅 Автопост:</b> {config.morning_post_time} (МСК)
-<b>⏳ Через:</b> {hours_until}ч {minutes_until}м
-
-<b>📤 Последний пост:</b> {last_post_result}
-
-<b>⚙️ Настройки:</b>
-• 🖼 Изображения: {img_status}
-• 🎨 Модель: {model_name}
-• 📝 Шаблон: {settings.text_template}
-"""
+        status_text = _STATUS_TEMPLATE.format_map({
+            "post_time": config.morning_post_time,
+            "hours_until": hours_until,
+            "minutes_until": minutes_until,
+            "last_post_result": last_post_result,
+            "img_status": img_status,
+            "model_name": model_name,
+            "template": settings.text_template,
+        })
         await message.answer(
             status_text, 
             parse_mode="HTML",
             reply_markup=main_menu_keyboard()
         )
-        logger.info(f"Admin {user_id} checked status")
+        logger.info("Admin %s checked status", user_id)
         
     except Exception as e:
-        logger.error(f"Error in cmd_status: {e}", exc_info=True)
+        logger.error("Error in cmd_status: %s", e, exc_info=True)
         await message.answer(
             f"❌ Произошла ошибка: {str(e)[:200]}",
             reply_markup=main_menu_keyboard()
@@ -201,12 +284,12 @@ async def cmd_test_holidays(message: Message) -> None:
     """
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await send_access_denied(message)
         return
     
     try:
-        update_user_activity(
+        track_user_activity(
             user_id=user_id,
             first_name=message.from_user.first_name,
             username=message.from_user.username,
@@ -217,26 +300,27 @@ async def cmd_test_holidays(message: Message) -> None:
             "🔍 Запрашиваю праздники на сегодня...",
             reply_markup=main_menu_keyboard()
         )
-        logger.info(f"Admin {user_id} testing holidays API")
+        logger.info("Admin %s testing holidays API", user_id)
         
-        today = datetime.now().date()
+        today = date.today()
         holidays = await fetch_holidays_for_date(today)
         
         if holidays:
-            holidays_text = f"🎉 <b>Праздники на {today.strftime('%d.%m.%Y')}:</b>\n\n"
+            parts = [f"🎉 <b>Праздники на {today:%d.%m.%Y}:</b>\n\n"]
             
             for i, holiday in enumerate(holidays[:10], 1):
                 name = holiday.get("name", "Без названия")
                 description = holiday.get("description", "")
                 holiday_type = holiday.get("type", "observance")
                 
-                holidays_text += f"{i}. <b>{name}</b>\n"
+                parts.append(f"{i}. <b>{name}</b>\n")
                 if description:
                     desc_short = description[:100] + "..." if len(description) > 100 else description
-                    holidays_text += f"   {desc_short}\n"
-                holidays_text += f"   <i>Тип: {holiday_type}</i>\n\n"
+                    parts.append(f"   {desc_short}\n")
+                parts.append(f"   <i>Тип: {holiday_type}</i>\n\n")
             
-            holidays_text += f"✅ Всего найдено: {len(holidays)} праздников"
+            parts.append(f"✅ Всего найдено: {len(holidays)} праздников")
+            holidays_text = "".join(parts)
         else:
             holidays_text = """
 ❌ <b>Праздники не найдены</b>
@@ -254,10 +338,10 @@ async def cmd_test_holidays(message: Message) -> None:
             parse_mode="HTML",
             reply_markup=main_menu_keyboard()
         )
-        logger.info(f"Holidays test completed: {len(holidays)} holidays found")
+        logger.info("Holidays test completed: %s holidays found", len(holidays))
         
     except Exception as e:
-        logger.error(f"Error in cmd_test_holidays: {e}", exc_info=True)
+        logger.error("Error in cmd_test_holidays: %s", e, exc_info=True)
         await message.answer(
             f"❌ Ошибка при запросе праздников: {str(e)[:200]}",
             reply_markup=main_menu_keyboard()
@@ -272,46 +356,26 @@ async def cmd_admin(message: Message) -> None:
     """
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await send_access_denied(message)
         return
     
     try:
-        update_user_activity(
+        track_user_activity(
             user_id=user_id,
             first_name=message.from_user.first_name,
             username=message.from_user.username,
             action="/admin"
         )
         
-        admin_help = """
-🔐 <b>Админ-команды</b>
-
-<b>Команды:</b>
-/post_now — Отправить пост прямо сейчас
-/status — Статус бота и следующий пост
-/test_holidays — Проверить API праздников
-/admin — Эта справка
-
-<b>Кнопки меню:</b>
-📨 Пост сейчас — отправить пост
-📊 Статус — информация о боте
-⚙️ Настройки — тесты и настройки
-ℹ️ Помощь — справка
-
-<b>Горячие советы:</b>
-• Используйте кнопки меню для удобства
-• Проверяйте логи: <code>journalctl -u utro-bot -f</code>
-• Перезапуск: <code>systemctl restart utro-bot</code>
-"""
         await message.answer(
-            admin_help, 
+            _ADMIN_HELP, 
             parse_mode="HTML",
             reply_markup=main_menu_keyboard()
         )
         
     except Exception as e:
-        logger.error(f"Error in cmd_admin: {e}", exc_info=True)
+        logger.error("Error in cmd_admin: %s", e, exc_info=True)
         await message.answer(
             "Произошла ошибка.",
             reply_markup=main_menu_keyboard()
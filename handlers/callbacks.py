@@ -3,11 +3,15 @@ Callback handlers for inline keyboard buttons.
 Handles all callback queries from inline keyboards.
 """
 
+import asyncio
 import logging
+import time
+from collections import OrderedDict
 from datetime import datetime, date
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
 
-from aiogram import Router, F, Bot
-from aiogram.types import CallbackQuery, BufferedInputFile
+from aiogram import Router, Bot
+from aiogram.types import CallbackQuery, BufferedInputFile, FSInputFile, InlineKeyboardMarkup, URLInputFile
 from aiogram.fsm.context import FSMContext
 
 from config import config
@@ -25,8 +29,12 @@ from keyboards import (
     recipe_category_keyboard,
     recipe_confirm_keyboard,
     cancel_keyboard,
-    skip_keyboard
+    skip_keyboard,
+    editing_keyboard
 )
+from handlers.admin import get_uptime, update_last_post_status
+from handlers.middlewares import AdminOnlyMiddleware
+from handlers.routing import CallbackRoutes
 from handlers.states import (
     ScheduleStates,
     TemplateStates,
@@ -37,52 +45,77 @@ from handlers.states import (
     TipStates,
     LifehackStates
 )
-from services.user_service import update_user_activity, format_user_stats
+from services.ai_content import generate_greeting
+from services.holidays_api import fetch_holidays_for_date, get_cached_holidays
+from services.image_generator import generate_food_image, generate_dalle_image_url
+from services.post_service import (
+    post_to_channel,
+    publish_pending_post,
+    get_pending_post,
+    generate_post_data,
+    store_pending_post,
+    send_preview_to_admin,
+    remove_pending_post,
+    channel_post_sem,
+    _pending_posts
+)
+from services.user_service import track_user_activity, track_posts_triggered, format_user_stats
 from services.settings_service import (
     get_settings, 
     update_settings, 
     TextTemplate, 
-    ImageModel
+    ImageModel,
+    get_image_model_info
 )
 from utils.logger import mask_user_id, mask_channel_id
+from utils.throttle import denial_throttle
+from utils.image_cache import test_image_cache
 
 logger = logging.getLogger(__name__)
 router = Router(name="callbacks")
 
+# All data-specific callbacks resolve through one dispatch table
+routes = CallbackRoutes()
+routes.attach(router)
 
-def is_admin(user_id: int) -> bool:
-    """Check if user is authorized admin."""
-    return config.is_admin(user_id)
+# Admin IDs frozenset, bound once for O(1) checks on the hot path
+_ADMINS = config.admin_user_ids
 
+# Debug mode is fixed at startup; bound once for the mask_user_id() log calls
+_DEBUG_MODE = config.debug_mode
 
-async def answer_unauthorized(callback: CallbackQuery) -> None:
-    """Answer callback for unauthorized users."""
-    await callback.answer("❌ У вас нет доступа", show_alert=True)
-    logger.warning(f"Unauthorized callback from {mask_user_id(callback.from_user.id, config.debug_mode)}")
+# Channel ID as shown on the status screen (config is fixed at startup)
+_MASKED_CHANNEL = mask_channel_id(config.channel_id, _DEBUG_MODE)
 
+# Seconds a neural test result is reused for repeat presses
+TEST_RESULT_TTL = 60
 
-# ============================================
-# SETTINGS MENU CALLBACKS
-# ============================================
+# Cached test results as action -> (cached_at, result), and in-flight test calls
+_test_results: Dict[str, Tuple[float, Any]] = {}
+_test_inflight: Dict[str, asyncio.Task] = {}
 
-@router.callback_query(F.data == "back_main")
-async def cb_back_main(callback: CallbackQuery) -> None:
-    """Handle 'Назад' button from settings - return to main menu."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
-    
-    try:
-        await callback.answer()
-        
-        update_user_activity(
-            user_id=callback.from_user.id,
-            first_name=callback.from_user.first_name,
-            username=callback.from_user.username,
-            action="cb_back_main"
-        )
-        
-        main_text = """
+# Bounds long-running image/recipe generations (each holds API connections)
+_gen_sem = asyncio.Semaphore(config.max_concurrent_generations)
+
+# Background post tasks are kept referenced until done
+_post_tasks: Set[asyncio.Task] = set()
+
+# Formatted legacy status screen as (built_at, text); uptime has 1s resolution
+STATUS_CACHE_TTL = 1.0
+_status_cache: Tuple[float, str] = (0.0, "")
+
+# Hash of the last text/caption sent per (chat_id, message_id), so double-taps
+# don't repeat an identical edit (Telegram would reject it as "not modified")
+EDIT_HISTORY_SIZE = 128
+_last_edits: "OrderedDict[Tuple[int, int], int]" = OrderedDict()
+
+# Seconds clients may cache callback answers: denials never change at runtime,
+# and navigation screens only need double-tap protection
+DENIAL_CACHE_TIME = 300
+NAV_CACHE_TIME = 5
+
+# Static message texts (built once at import)
+_MAIN_MENU_TEXT = """
 🍽 <b>Utro Bot</b>
 
 Используйте кнопки меню для управления ботом.
@@ -92,217 +125,470 @@ async def cb_back_main(callback: CallbackQuery) -> None:
 • ⚙️ <b>Настройки</b> — настройки и тесты
 • ℹ️ <b>Помощь</b> — справка
 """
-        await callback.message.edit_text(
-            main_text,
-            parse_mode="HTML"
-        )
-        
-    except Exception as e:
-        logger.error(f"Error in cb_back_main: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
-
 
-@router.callback_query(F.data == "back_settings")
-async def cb_back_settings(callback: CallbackQuery) -> None:
-    """Handle 'Назад' button - return to settings menu."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
-    
-    try:
-        await callback.answer()
-        
-        from services.settings_service import get_settings
-        settings = get_settings()
-        
-        img_status = "вкл" if settings.image_enabled else "выкл"
-        model_name = "DALL-E 3" if settings.image_model == ImageModel.DALLE3.value else "Flux"
-        
-        settings_text = f"""
+_SETTINGS_TEMPLATE = """
 ⚙️ <b>Настройки</b>
 
 <b>Текущие параметры:</b>
 🖼 Изображение: {img_status}
 🎨 Модель: {model_name}
-📝 Шаблон: {settings.text_template}
+📝 Шаблон: {template}
 
 Выберите настройку для изменения:
 """
-        await callback.message.edit_text(
-            settings_text,
-            parse_mode="HTML",
-            reply_markup=settings_keyboard()
-        )
-        
-    except Exception as e:
-        logger.error(f"Error in cb_back_settings: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
 
+_STATUS_TEMPLATE = """
+📊 <b>Статус бота</b>
 
-@router.callback_query(F.data == "schedule")
-async def cb_schedule(callback: CallbackQuery) -> None:
-    """Handle 'Расписание' button - show schedule settings."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
+⏱ <b>Аптайм:</b> {days}д {hours}ч {minutes}м
+📅 <b>Время поста:</b> {post_time} (МСК)
+📢 <b>Канал:</b> {channel}
+"""
+
+_NO_HOLIDAYS_TEXT = "❌ <b>Праздники не найдены</b>\n\nПроверьте файл data/food_holidays.json"
+
+_GPT_LOADING_TEXT = (
+    "🤖 <b>Генерирую тестовый контент...</b>\n\n"
+    "Это может занять 10-30 секунд."
+)
+
+_GPT_RESULT_TEMPLATE = """
+🤖 <b>Тест GPT-4o mini</b>
+
+<b>Сгенерированное приветствие:</b>
+
+{greeting}
+
+✅ <i>AI работает корректно!</i>
+"""
+
+_DALLE_LOADING_TEXT = (
+    "🎨 <b>Генерирую тестовое изображение...</b>\n\n"
+    "Это может занять 30-60 секунд.\n"
+    "Стоимость: ~$0.04"
+)
+
+_DALLE_CAPTION = "🎨 <b>Тестовое изображение DALL-E 3</b>\n\n✅ Генерация работает корректно!"
+
+_IMAGE_DONE_TEXT = "✅ <b>Изображение сгенерировано!</b>\n\nСмотрите выше ⬆️"
+
+_DALLE_FAILED_TEXT = (
+    "❌ <b>Не удалось сгенерировать изображение</b>\n\n"
+    "Проверьте баланс OpenAI и API ключ."
+)
+
+_GENERATION_BUSY_TEXT = "⏳ Сейчас идёт несколько генераций. Попробуйте через минуту."
+_POST_CANCELLED_TEXT = "❌ <b>Отправка поста отменена.</b>"
+_PREVIEW_CANCELLED_TEXT = "❌ <b>Публикация отменена</b>\n\nИспользуйте меню для создания нового поста."
+_NEW_POST_CANCELLED_TEXT = "❌ <b>Публикация отменена</b>"
+
+_SETTINGS_MENU_TEXT = "⚙️ <b>Настройки</b>\n\nВыберите параметр:"
+
+_NEURAL_TESTS_TEXT = (
+    "🧪 <b>Тест нейросетей</b>\n\n"
+    "Выберите тест:"
+)
+
+_MODEL_SELECT_TEXT = (
+    "🎨 <b>Выбор модели генерации изображений</b>\n\n"
+    "• <b>DALL-E 3</b> — Высокое качество, OpenAI\n"
+    "• <b>Flux</b> — Быстрая генерация, Together AI\n\n"
+    "Выберите модель:"
+)
+
+_TEMPLATE_SELECT_TEXT = (
+    "📝 <b>Выбор длины поста</b>\n\n"
+    "• <b>Короткий</b> (~800 символов) — Компактный пост\n"
+    "• <b>Средний</b> (~1000 символов) — Стандартный\n"
+    "• <b>Длинный</b> (~2000 символов) — Подробный\n"
+    "• <b>Свой</b> — Указать количество символов\n\n"
+    "Выберите шаблон:"
+)
+
+_NEW_POST_TEXT = (
+    "✨ <b>Новый пост</b>\n\n"
+    "Выберите тип поста:"
+)
+
+_POLL_PROMPT_TEXT = (
+    "📊 <b>Создание опроса</b>\n\n"
+    "Напишите тему опроса или нажмите «Пропустить» для автогенерации.\n\n"
+    "<i>Примеры:</i>\n"
+    "• Какой завтрак вы предпочитаете?\n"
+    "• Лучшая кухня мира?\n"
+    "• Сладкое или солёное?"
+)
+
+_TIP_PROMPT_TEXT = (
+    "💡 <b>Кулинарный совет</b>\n\n"
+    "Напишите тему совета или нажмите «Пропустить».\n\n"
+    "<i>Примеры:</i>\n"
+    "• Как правильно варить рис\n"
+    "• Секреты сочного мяса\n"
+    "• Как хранить зелень"
+)
+
+_LIFEHACK_PROMPT_TEXT = (
+    "🔧 <b>Кухонный лайфхак</b>\n\n"
+    "Напишите тему лайфхака или нажмите «Пропустить».\n\n"
+    "<i>Примеры:</i>\n"
+    "• Как быстро почистить чеснок\n"
+    "• Лайфхаки с микроволновкой\n"
+    "• Как сохранить продукты свежими"
+)
+
+_RECIPE_CATEGORY_TEXT = (
+    "🍳 <b>Выберите тип рецепта</b>\n\n"
+    "Бот сгенерирует пост с рецептом выбранной категории:"
+)
+
+# Recipe category display names: with emoji for menus, plain for inline text
+_RECIPE_CATEGORY_LABELS = {
+    "pp": "🥗 ПП",
+    "keto": "🥑 Кето",
+    "vegan": "🌱 Веган",
+    "detox": "🍵 Детокс",
+    "breakfast": "🍳 Завтраки",
+    "dessert": "🍰 ПП-десерты",
+    "smoothie": "🥤 Смузи",
+    "soup": "🥣 Супы"
+}
+
+_RECIPE_CATEGORY_NAMES = {
+    "pp": "ПП",
+    "keto": "Кето",
+    "vegan": "Веган",
+    "detox": "Детокс",
+    "breakfast": "Завтраки",
+    "dessert": "ПП-десерты",
+    "smoothie": "Смузи",
+    "soup": "Супы"
+}
+
+# Test image texts, filled per press with model_name (and cost)
+_TEST_IMAGE_CONFIRM_TEMPLATE = (
+    "🖼 <b>Тест генерации изображения</b>\n\n"
+    "<b>Модель:</b> {model_name}\n"
+    "<b>Стоимость:</b> {cost}\n\n"
+    "Будет сгенерировано тестовое изображение блюда.\n"
+    "Продолжить?"
+)
+
+_TEST_IMAGE_LOADING_TEMPLATE = (
+    "🎨 <b>Генерирую тестовое изображение...</b>\n\n"
+    "Модель: {model_name}\n"
+    "Это может занять 30-60 секунд."
+)
+
+_TEST_IMAGE_CAPTION_TEMPLATE = (
+    "🎨 <b>Тестовое изображение</b>\n\n"
+    "✅ Модель: {model_name}\n"
+    "Генерация работает корректно!"
+)
+_TEST_IMAGE_CACHED_NOTE = "\n\n♻️ Из кэша (без запроса к API)"
+
+# Fixed prompt for the image test, so results can be cached per model
+_TEST_IMAGE_PROMPT = "healthy colorful salad bowl with fresh vegetables, appetizing food photography"
+
+
+async def answer_unauthorized(callback: CallbackQuery) -> None:
+    """Answer callback for unauthorized users (alert once per minute per user)."""
+    if not denial_throttle.allow(callback.from_user.id):
+        # Still answer to stop the client's spinner, but silently
+        await callback.answer(cache_time=DENIAL_CACHE_TIME)
         return
+    await callback.answer("❌ У вас нет доступа", show_alert=True, cache_time=DENIAL_CACHE_TIME)
+    if logger.isEnabledFor(logging.WARNING):
+        logger.warning("Unauthorized callback from %s", mask_user_id(callback.from_user.id, _DEBUG_MODE))
+
+
+def _is_unrouted(callback: CallbackQuery) -> bool:
+    """Check if callback_data matches no route (stale or unknown buttons)."""
+    return routes.resolve(callback.data) is None
+
+
+# Every routed callback in this router is admin-only: reject others once,
+# before routing. Unrouted data still reaches the fallback, so anyone pressing
+# a stale or unknown button is told the command is unknown
+router.callback_query.outer_middleware(
+    AdminOnlyMiddleware(_ADMINS, answer_unauthorized, exempt=_is_unrouted)
+)
+
+
+def _track(callback: CallbackQuery, action: str) -> None:
+    """Record the user's button press without blocking the handler."""
+    track_user_activity(
+        user_id=callback.from_user.id,
+        first_name=callback.from_user.first_name,
+        username=callback.from_user.username,
+        action=action
+    )
+
+
+def _is_unchanged(message, text: str, reply_markup=None) -> bool:
+    """Check if message already shows this HTML text and keyboard."""
+    return (
+        getattr(message, "html_text", None) == text.strip()
+        and message.reply_markup == reply_markup
+    )
+
+
+def _is_repeat_edit(message, text: str) -> bool:
+    """
+    Check if `text` was already sent to this message, and remember it if not.
     
-    try:
-        await callback.answer()
+    Covers double-taps where the callback still carries the old message.
+    """
+    key = (message.chat.id, message.message_id)
+    text_hash = hash(text)
+    if _last_edits.get(key) == text_hash:
+        _last_edits.move_to_end(key)
+        return True
+    _last_edits[key] = text_hash
+    _last_edits.move_to_end(key)
+    if len(_last_edits) > EDIT_HISTORY_SIZE:
+        _last_edits.popitem(last=False)
+    return False
+
+
+async def _answer_and_show(
+    callback: CallbackQuery,
+    text: str,
+    reply_markup: Optional[InlineKeyboardMarkup] = None,
+    answer_text: Optional[str] = None,
+    cache_time: Optional[int] = None
+) -> None:
+    """
+    Answer the callback and edit its message to `text` concurrently.
+    
+    The edit is skipped when the message already shows this text and
+    keyboard, since Telegram rejects no-op edits ("message is not modified").
+    """
+    answer = callback.answer(answer_text, cache_time=cache_time)
+    if _is_unchanged(callback.message, text, reply_markup):
+        await answer
+        return
+    await asyncio.gather(
+        answer,
+        callback.message.edit_text(text, parse_mode="HTML", reply_markup=reply_markup)
+    )
+
+
+def _status_text() -> str:
+    """Format the legacy status screen, reusing the result within STATUS_CACHE_TTL."""
+    global _status_cache
+    now = time.monotonic()
+    cached_at, text = _status_cache
+    if text and now - cached_at < STATUS_CACHE_TTL:
+        return text
+    
+    uptime = get_uptime()
+    hours, remainder = divmod(uptime.seconds, 3600)
+    minutes, _ = divmod(remainder, 60)
+    
+    text = _STATUS_TEMPLATE.format(
+        days=uptime.days,
+        hours=hours,
+        minutes=minutes,
+        post_time=config.morning_post_time,
+        channel=_MASKED_CHANNEL
+    )
+    _status_cache = (now, text)
+    return text
+
+
+async def _single_flight(key: str, ttl: float, coro_factory: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Run an expensive test call at most once per `ttl` seconds.
+    
+    Concurrent presses join the in-flight call instead of starting
+    another paid API request; successful results are reused until expiry.
+    """
+    cached = _test_results.get(key)
+    if cached is not None and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+    
+    task = _test_inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(coro_factory())
+        _test_inflight[key] = task
         
-        update_user_activity(
-            user_id=callback.from_user.id,
-            first_name=callback.from_user.first_name,
-            username=callback.from_user.username,
-            action="cb_schedule"
-        )
+        def _done(t: asyncio.Task) -> None:
+            _test_inflight.pop(key, None)
+            if not t.cancelled() and t.exception() is None:
+                _test_results[key] = (time.monotonic(), t.result())
         
-        current_time = config.morning_post_time
-        schedule_text = f"""
+        task.add_done_callback(_done)
+    
+    # Shield so one cancelled press doesn't cancel the shared request
+    return await asyncio.shield(task)
+
+
+def _ignore_task_error(task: asyncio.Task) -> None:
+    """Done callback for best-effort UI tasks: retrieve and drop the error."""
+    if not task.cancelled() and task.exception() is not None:
+        logger.debug("Background UI update failed: %s", task.exception())
+
+
+# ============================================
+# SETTINGS MENU CALLBACKS
+# ============================================
+
+# callback_data -> (text, keyboard factory) for submenus with static content
+_MENU_SCREENS = {
+    "settings:neural_tests": (_NEURAL_TESTS_TEXT, neural_tests_keyboard),
+    "settings:model_select": (_MODEL_SELECT_TEXT, model_select_keyboard),
+    "settings:template_select": (_TEMPLATE_SELECT_TEXT, template_select_keyboard),
+    "newpost:recipe": (_RECIPE_CATEGORY_TEXT, recipe_category_keyboard),
+}
+
+
+@routes.exact(*_MENU_SCREENS)
+async def cb_menu_screen(callback: CallbackQuery) -> None:
+    """Show a static submenu (neural tests, model/template select, recipe categories)."""
+    text, keyboard_factory = _MENU_SCREENS[callback.data]
+    await _answer_and_show(callback, text, keyboard_factory())
+
+
+@routes.exact("back_main")
+async def cb_back_main(callback: CallbackQuery) -> None:
+    """Handle 'Назад' button from settings - return to main menu."""
+    _track(callback, "cb_back_main")
+    
+    await _answer_and_show(callback, _MAIN_MENU_TEXT, cache_time=NAV_CACHE_TIME)
+
+
+@routes.exact("back_settings")
+async def cb_back_settings(callback: CallbackQuery) -> None:
+    """Handle 'Назад' button - return to settings menu."""
+    settings = get_settings()
+    
+    img_status = "вкл" if settings.image_enabled else "выкл"
+    model_name, _ = get_image_model_info(settings.image_model)
+    
+    settings_text = _SETTINGS_TEMPLATE.format_map({
+        "img_status": img_status,
+        "model_name": model_name,
+        "template": settings.text_template,
+    })
+    
+    await _answer_and_show(callback, settings_text, settings_keyboard(), cache_time=NAV_CACHE_TIME)
+
+
+@routes.exact("schedule")
+async def cb_schedule(callback: CallbackQuery) -> None:
+    """Handle 'Расписание' button - show schedule settings."""
+    _track(callback, "cb_schedule")
+    
+    current_time = config.morning_post_time
+    schedule_text = f"""
 ⏰ <b>Расписание постинга</b>
 
 <b>Текущее время:</b> {current_time} (МСК)
 
 Выберите новое время:
 """
-        await callback.message.edit_text(
-            schedule_text,
-            parse_mode="HTML",
-            reply_markup=schedule_keyboard()
-        )
-        
-    except Exception as e:
-        logger.error(f"Error in cb_schedule: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
+    await _answer_and_show(callback, schedule_text, schedule_keyboard(), cache_time=NAV_CACHE_TIME)
 
 
 # ============================================
 # NEW SETTINGS CALLBACKS (v2)
 # ============================================
 
-@router.callback_query(F.data == "settings:image_toggle")
+@routes.exact("settings:image_toggle")
 async def cb_image_toggle(callback: CallbackQuery) -> None:
     """Toggle image generation on/off."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
+    settings = get_settings()
+    new_value = not settings.image_enabled
+    update_settings(image_enabled=new_value)
     
-    try:
-        settings = get_settings()
-        new_value = not settings.image_enabled
-        update_settings(image_enabled=new_value)
-        
-        status = "✅ вкл" if new_value else "❌ выкл"
-        await callback.answer(f"Изображение: {status}")
-        
-        await callback.message.edit_reply_markup(reply_markup=settings_keyboard())
-        
-    except Exception as e:
-        logger.error(f"Error in cb_image_toggle: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
-
-
-@router.callback_query(F.data == "settings:neural_tests")
-async def cb_neural_tests(callback: CallbackQuery) -> None:
-    """Show neural network tests submenu."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
-    
-    try:
-        await callback.answer()
-        
-        await callback.message.edit_text(
-            "🧪 <b>Тест нейросетей</b>\n\n"
-            "Выберите тест:",
-            parse_mode="HTML",
-            reply_markup=neural_tests_keyboard()
-        )
-        
-    except Exception as e:
-        logger.error(f"Error in cb_neural_tests: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
+    status = "✅ вкл" if new_value else "❌ выкл"
+    await asyncio.gather(
+        callback.answer(f"Изображение: {status}"),
+        callback.message.edit_reply_markup(reply_markup=settings_keyboard())
+    )
 
 
-@router.callback_query(F.data == "test_image_confirm")
+@routes.exact("test_image_confirm")
 async def cb_test_image_confirm(callback: CallbackQuery) -> None:
     """Show confirmation before generating test image."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
+    settings = get_settings()
+    model_name, cost = get_image_model_info(settings.image_model)
     
-    try:
-        await callback.answer()
-        
-        settings = get_settings()
-        model_name = "DALL-E 3" if settings.image_model == ImageModel.DALLE3.value else "Flux"
-        cost = "~$0.04" if settings.image_model == ImageModel.DALLE3.value else "~$0.003"
-        
-        await callback.message.edit_text(
-            f"🖼 <b>Тест генерации изображения</b>\n\n"
-            f"<b>Модель:</b> {model_name}\n"
-            f"<b>Стоимость:</b> {cost}\n\n"
-            f"Будет сгенерировано тестовое изображение блюда.\n"
-            f"Продолжить?",
-            parse_mode="HTML",
-            reply_markup=confirm_image_test_keyboard()
-        )
-        
-    except Exception as e:
-        logger.error(f"Error in cb_test_image_confirm: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
+    await _answer_and_show(
+        callback,
+        _TEST_IMAGE_CONFIRM_TEMPLATE.format_map({"model_name": model_name, "cost": cost}),
+        confirm_image_test_keyboard()
+    )
 
 
-@router.callback_query(F.data == "test_image_run")
+@routes.exact("test_image_run")
 async def cb_test_image_run(callback: CallbackQuery) -> None:
     """Generate test image with selected model."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
+    if _gen_sem.locked():
+        await callback.answer(_GENERATION_BUSY_TEXT, show_alert=True)
         return
     
     try:
         settings = get_settings()
-        model_name = "DALL-E 3" if settings.image_model == ImageModel.DALLE3.value else "Flux"
-        
-        await callback.answer(f"🎨 Генерирую ({model_name})...")
+        model_name, _ = get_image_model_info(settings.image_model)
         
-        update_user_activity(
-            user_id=callback.from_user.id,
-            first_name=callback.from_user.first_name,
-            username=callback.from_user.username,
-            action="test_image_run"
-        )
+        _track(callback, "test_image_run")
         
-        await callback.message.edit_text(
-            f"🎨 <b>Генерирую тестовое изображение...</b>\n\n"
-            f"Модель: {model_name}\n"
-            f"Это может занять 30-60 секунд.",
-            parse_mode="HTML"
-        )
-        
-        # Generate image using current model
-        from services.image_generator import generate_food_image
-        image_bytes = await generate_food_image(
-            recipe_name="Тестовое изображение",
-            english_prompt="healthy colorful salad bowl with fresh vegetables, appetizing food photography"
-        )
-        
-        if image_bytes:
-            photo = BufferedInputFile(image_bytes, filename=f"test_{model_name.lower().replace(' ', '_')}.jpg")
-            await callback.message.answer_photo(
-                photo=photo,
-                caption=f"🎨 <b>Тестовое изображение</b>\n\n"
-                        f"✅ Модель: {model_name}\n"
-                        f"Генерация работает корректно!",
+        # Answer the callback and show the loading state concurrently
+        await asyncio.gather(
+            callback.answer(f"🎨 Генерирую ({model_name})..."),
+            callback.message.edit_text(
+                _TEST_IMAGE_LOADING_TEMPLATE.format_map({"model_name": model_name}),
                 parse_mode="HTML"
             )
-            
-            await callback.message.edit_text(
-                "✅ <b>Изображение сгенерировано!</b>\n\nСмотрите выше ⬆️",
-                parse_mode="HTML",
-                reply_markup=neural_tests_keyboard()
+        )
+        
+        # Reuse the stored image for this model, generate only on a miss
+        # (cache file I/O runs in a worker thread, off the event loop)
+        cache_key = test_image_cache.make_key(settings.image_model, _TEST_IMAGE_PROMPT)
+        cached_path = await asyncio.to_thread(test_image_cache.lookup, cache_key)
+        from_cache = cached_path is not None
+        image_bytes = None
+        
+        if not from_cache:
+            async with _gen_sem:
+                image_bytes = await generate_food_image(
+                    recipe_name="Тестовое изображение",
+                    english_prompt=_TEST_IMAGE_PROMPT
+                )
+            if image_bytes:
+                cached_path = await asyncio.to_thread(test_image_cache.put, cache_key, image_bytes)
+        
+        # Stream the cached file when there is one; upload from memory only
+        # if the cache could not be written
+        filename = f"test_{settings.image_model}.jpg"
+        if cached_path is not None:
+            photo = FSInputFile(cached_path, filename=filename)
+        elif image_bytes:
+            photo = BufferedInputFile(image_bytes, filename=filename)
+        else:
+            photo = None
+        
+        if photo is not None:
+            caption = _TEST_IMAGE_CAPTION_TEMPLATE.format_map({"model_name": model_name})
+            if from_cache:
+                caption += _TEST_IMAGE_CACHED_NOTE
+            # Send the image and update the original message concurrently
+            await asyncio.gather(
+                callback.message.answer_photo(
+                    photo=photo,
+                    caption=caption,
+                    parse_mode="HTML"
+                ),
+                callback.message.edit_text(
+                    _IMAGE_DONE_TEXT,
+                    parse_mode="HTML",
+                    reply_markup=neural_tests_keyboard()
+                )
             )
             
-            logger.info(f"{mask_user_id(callback.from_user.id, config.debug_mode)} tested {model_name}")
+            logger.info("%s tested %s", mask_user_id(callback.from_user.id, _DEBUG_MODE), model_name)
         else:
             await callback.message.edit_text(
                 f"❌ <b>Не удалось сгенерировать</b>\n\n"
@@ -312,7 +598,7 @@ async def cb_test_image_run(callback: CallbackQuery) -> None:
             )
         
     except Exception as e:
-        logger.error(f"Error in cb_test_image_run: {e}", exc_info=True)
+        logger.error("Error in cb_test_image_run: %s", e, exc_info=True)
         await callback.message.edit_text(
             f"⚠️ <b>Ошибка:</b>\n\n{str(e)[:200]}",
             parse_mode="HTML",
@@ -320,113 +606,50 @@ async def cb_test_image_run(callback: CallbackQuery) -> None:
         )
 
 
-@router.callback_query(F.data == "settings:model_select")
-async def cb_model_select(callback: CallbackQuery) -> None:
-    """Show model selection menu."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
-    
-    try:
-        await callback.answer()
-        
-        await callback.message.edit_text(
-            "🎨 <b>Выбор модели генерации изображений</b>\n\n"
-            "• <b>DALL-E 3</b> — Высокое качество, OpenAI\n"
-            "• <b>Flux</b> — Быстрая генерация, Together AI\n\n"
-            "Выберите модель:",
-            parse_mode="HTML",
-            reply_markup=model_select_keyboard()
-        )
-        
-    except Exception as e:
-        logger.error(f"Error in cb_model_select: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
-
-
-@router.callback_query(F.data.startswith("model:"))
-async def cb_select_model(callback: CallbackQuery) -> None:
+@routes.prefix("model:")
+async def cb_select_model(callback: CallbackQuery, route_arg: str) -> None:
     """Handle model selection."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
-    
-    try:
-        model = callback.data.split(":")[1]
-        update_settings(image_model=model)
-        
-        model_name = "DALL-E 3" if model == ImageModel.DALLE3.value else "Flux"
-        await callback.answer(f"Модель: {model_name}")
-        
-        await callback.message.edit_text(
-            "⚙️ <b>Настройки</b>\n\nВыберите параметр:",
-            parse_mode="HTML",
-            reply_markup=settings_keyboard()
-        )
-        
-    except Exception as e:
-        logger.error(f"Error in cb_select_model: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
-
-
-@router.callback_query(F.data == "settings:template_select")
-async def cb_template_select(callback: CallbackQuery) -> None:
-    """Show template selection menu."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
+    model = route_arg
+    update_settings(image_model=model)
     
-    try:
-        await callback.answer()
-        
-        await callback.message.edit_text(
-            "📝 <b>Выбор длины поста</b>\n\n"
-            "• <b>Короткий</b> (~800 символов) — Компактный пост\n"
-            "• <b>Средний</b> (~1000 символов) — Стандартный\n"
-            "• <b>Длинный</b> (~2000 символов) — Подробный\n"
-            "• <b>Свой</b> — Указать количество символов\n\n"
-            "Выберите шаблон:",
-            parse_mode="HTML",
-            reply_markup=template_select_keyboard()
-        )
-        
-    except Exception as e:
-        logger.error(f"Error in cb_template_select: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
+    model_name, _ = get_image_model_info(model)
+    await _answer_and_show(
+        callback, _SETTINGS_MENU_TEXT, settings_keyboard(), answer_text=f"Модель: {model_name}"
+    )
 
 
-@router.callback_query(F.data.startswith("template:"))
-async def cb_select_template(callback: CallbackQuery, state: FSMContext) -> None:
+@routes.prefix("template:")
+async def cb_select_template(callback: CallbackQuery, state: FSMContext, route_arg: str) -> None:
     """Handle template selection."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
+    template = route_arg
     
-    try:
-        template = callback.data.split(":")[1]
-        
-        if template == "custom_length":
-            # Enter FSM state for custom length input
-            await state.set_state(TemplateStates.waiting_for_custom_length)
-            await callback.answer()
-            await callback.message.edit_text(
+    if template == "custom_length":
+        # Enter FSM state for custom length input
+        await state.set_state(TemplateStates.waiting_for_custom_length)
+        # Answer, edit the prompt and send the reply keyboard concurrently
+        await asyncio.gather(
+            callback.answer(),
+            callback.message.edit_text(
                 "🔢 <b>Своя длина поста</b>\n\n"
                 "Отправьте желаемое количество символов.\n"
                 "Допустимый диапазон: 100 — 5000\n\n"
                 "Например: <code>1500</code>",
                 parse_mode="HTML"
-            )
-            await callback.message.answer(
+            ),
+            callback.message.answer(
                 "Жду число символов...",
                 reply_markup=cancel_keyboard()
             )
-            return
-        
-        if template == "CUSTOM":
-            # Enter FSM state for custom template text
-            await state.set_state(TemplateStates.waiting_for_custom_template)
-            await callback.answer()
-            await callback.message.edit_text(
+        )
+        return
+    
+    if template == "CUSTOM":
+        # Enter FSM state for custom template text
+        await state.set_state(TemplateStates.waiting_for_custom_template)
+        # Answer, edit the prompt and send the reply keyboard concurrently
+        await asyncio.gather(
+            callback.answer(),
+            callback.message.edit_text(
                 "✏️ <b>Свой шаблон</b>\n\n"
                 "Опишите формат постов, который вам нужен.\n\n"
                 "<i>Примеры:</i>\n"
@@ -434,145 +657,88 @@ async def cb_select_template(callback: CallbackQuery, state: FSMContext) -> None
                 "• «Короткий совет + интересный факт в конце»\n"
                 "• «Формат: название, время готовки, ингредиенты, шаги»",
                 parse_mode="HTML"
-            )
-            await callback.message.answer(
+            ),
+            callback.message.answer(
                 "Жду описание шаблона...",
                 reply_markup=cancel_keyboard()
             )
-            return
-        
-        update_settings(text_template=template)
-        
-        template_names = {
-            "SHORT": "Короткий (~500)",
-            "MEDIUM": "Средний (~900)",
-            "LONG": "Длинный (~1800)"
-        }
-        await callback.answer(f"✅ {template_names.get(template, template)}")
-        
-        await callback.message.edit_text(
-            "⚙️ <b>Настройки</b>\n\nВыберите параметр:",
-            parse_mode="HTML",
-            reply_markup=settings_keyboard()
         )
-        
-    except Exception as e:
-        logger.error(f"Error in cb_select_template: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
+        return
+    
+    update_settings(text_template=template)
+    
+    template_names = {
+        "SHORT": "Короткий (~500)",
+        "MEDIUM": "Средний (~900)",
+        "LONG": "Длинный (~1800)"
+    }
+    await _answer_and_show(
+        callback,
+        _SETTINGS_MENU_TEXT,
+        settings_keyboard(),
+        answer_text=f"✅ {template_names.get(template, template)}"
+    )
 
 
-@router.callback_query(F.data == "cancel_action")
+@routes.exact("cancel_action")
 async def cb_cancel_action(callback: CallbackQuery) -> None:
     """Universal cancel handler."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
-    
-    await callback.answer("Отменено")
-    await callback.message.edit_text(
-        "✅ Действие отменено",
-        reply_markup=None
-    )
+    await _answer_and_show(callback, "✅ Действие отменено", answer_text="Отменено")
 
 
-@router.callback_query(F.data.startswith("set_time_"))
-async def cb_set_time_legacy(callback: CallbackQuery) -> None:
+@routes.prefix("set_time_")
+async def cb_set_time_legacy(callback: CallbackQuery, route_arg: str) -> None:
     """Handle legacy time selection buttons."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
-    
-    try:
-        hour = callback.data.replace("set_time_", "")
-        await callback.answer(
-            f"⏰ Для изменения времени на {hour}:00 отредактируйте .env файл:\n"
-            f"MORNING_POST_TIME={hour}:00",
-            show_alert=True
-        )
-        
-    except Exception as e:
-        logger.error(f"Error in cb_set_time: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
+    hour = route_arg
+    await callback.answer(
+        f"⏰ Для изменения времени на {hour}:00 отредактируйте .env файл:\n"
+        f"MORNING_POST_TIME={hour}:00",
+        show_alert=True
+    )
 
 
-@router.callback_query(F.data.startswith("set_time:"))
-async def cb_set_time_new(callback: CallbackQuery, state: FSMContext) -> None:
+@routes.prefix("set_time:")
+async def cb_set_time_new(callback: CallbackQuery, state: FSMContext, route_arg: str) -> None:
     """Handle new time selection buttons."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
+    time_value = route_arg
     
-    try:
-        time_value = callback.data.split(":")[1]
+    if time_value == "custom":
+        # Enter FSM state for custom time input
+        await state.set_state(ScheduleStates.waiting_for_custom_time)
+        await _answer_and_show(
+            callback,
+            "🕐 <b>Своё время постинга</b>\n\n"
+            "Отправьте время в формате ЧЧ:ММ\n"
+            "Например: <code>06:30</code> или <code>11:45</code>\n\n"
+            "Отправьте /cancel для отмены."
+        )
+    else:
+        # Direct time selection
+        if len(time_value) == 2:
+            time_value = f"{time_value}:00"
         
-        if time_value == "custom":
-            # Enter FSM state for custom time input
-            await state.set_state(ScheduleStates.waiting_for_custom_time)
-            await callback.answer()
-            await callback.message.edit_text(
-                "🕐 <b>Своё время постинга</b>\n\n"
-                "Отправьте время в формате ЧЧ:ММ\n"
-                "Например: <code>06:30</code> или <code>11:45</code>\n\n"
-                "Отправьте /cancel для отмены.",
-                parse_mode="HTML"
-            )
-        else:
-            # Direct time selection
-            if len(time_value) == 2:
-                time_value = f"{time_value}:00"
-            
-            await callback.answer(
-                f"⏰ Для изменения времени на {time_value}\n"
-                f"отредактируйте MORNING_POST_TIME в .env файле.",
-                show_alert=True
-            )
-        
-    except Exception as e:
-        logger.error(f"Error in cb_set_time_new: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
+        await callback.answer(
+            f"⏰ Для изменения времени на {time_value}\n"
+            f"отредактируйте MORNING_POST_TIME в .env файле.",
+            show_alert=True
+        )
 
 
 # ============================================
 # NEW POST FLOW CALLBACKS (v3)
 # ============================================
 
-@router.callback_query(F.data == "newpost:recipe")
-async def cb_newpost_recipe(callback: CallbackQuery) -> None:
-    """Show recipe category selection."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
-    
-    try:
-        await callback.answer()
-        
-        await callback.message.edit_text(
-            "🍳 <b>Выберите тип рецепта</b>\n\n"
-            "Бот сгенерирует пост с рецептом выбранной категории:",
-            parse_mode="HTML",
-            reply_markup=recipe_category_keyboard()
-        )
-        
-    except Exception as e:
-        logger.error(f"Error in cb_newpost_recipe: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
-
-
-@router.callback_query(F.data == "newpost:custom")
+@routes.exact("newpost:custom")
 async def cb_newpost_custom(callback: CallbackQuery, state: FSMContext) -> None:
     """Start custom post creation - enter FSM for content input."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
+    # Store category and enter content input state
+    await state.update_data(category="custom")
+    await state.set_state(NewPostStates.waiting_for_content)
     
-    try:
-        await callback.answer()
-        
-        # Store category and enter content input state
-        await state.update_data(category="custom")
-        await state.set_state(NewPostStates.waiting_for_content)
-        
-        await callback.message.edit_text(
+    # Answer, edit the prompt and send the reply keyboard concurrently
+    await asyncio.gather(
+        callback.answer(),
+        callback.message.edit_text(
             "💡 <b>Своя идея</b>\n\n"
             "Отправьте идею для поста:\n"
             "• Фото с подписью 📷\n"
@@ -580,236 +746,115 @@ async def cb_newpost_custom(callback: CallbackQuery, state: FSMContext) -> None:
             "• Или фото отдельно\n\n"
             "<i>Если отправите фото с подписью — бот использует оба!</i>",
             parse_mode="HTML"
-        )
-        
-        # Send cancel keyboard
-        await callback.message.answer(
+        ),
+        callback.message.answer(
             "Жду вашу идею...",
             reply_markup=cancel_keyboard()
         )
-        
-        logger.info(f"{mask_user_id(callback.from_user.id, config.debug_mode)} started custom post flow")
-        
-    except Exception as e:
-        logger.error(f"Error in cb_newpost_custom: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
+    )
+    
+    logger.info("%s started custom post flow", mask_user_id(callback.from_user.id, _DEBUG_MODE))
 
 
-@router.callback_query(F.data == "newpost:back")
+@routes.exact("newpost:back")
 async def cb_newpost_back(callback: CallbackQuery, state: FSMContext) -> None:
     """Go back to new post category selection."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
-    
-    try:
-        # Clear any FSM state
-        await state.clear()
-        await callback.answer()
-        
-        await callback.message.edit_text(
-            "✨ <b>Новый пост</b>\n\n"
-            "Выберите тип поста:",
-            parse_mode="HTML",
-            reply_markup=new_post_category_keyboard()
-        )
-        
-    except Exception as e:
-        logger.error(f"Error in cb_newpost_back: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
+    # Clear any FSM state
+    await state.clear()
+    await _answer_and_show(callback, _NEW_POST_TEXT, new_post_category_keyboard())
 
 
 # ============================================
 # NEW POST CATEGORIES (Poll, Tip, Lifehack)
 # ============================================
 
-@router.callback_query(F.data == "newpost:poll")
-async def cb_newpost_poll(callback: CallbackQuery, state: FSMContext) -> None:
-    """Start poll creation."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
-    
-    try:
-        await callback.answer()
-        await state.update_data(category="poll")
-        await state.set_state(PollStates.waiting_for_topic)
-        
-        await callback.message.edit_text(
-            "📊 <b>Создание опроса</b>\n\n"
-            "Напишите тему опроса или нажмите «Пропустить» для автогенерации.\n\n"
-            "<i>Примеры:</i>\n"
-            "• Какой завтрак вы предпочитаете?\n"
-            "• Лучшая кухня мира?\n"
-            "• Сладкое или солёное?",
-            parse_mode="HTML"
-        )
-        
-        await callback.message.answer(
-            "Жду тему опроса...",
-            reply_markup=skip_keyboard()
-        )
-        
-    except Exception as e:
-        logger.error(f"Error in cb_newpost_poll: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
+# callback_data -> (category, topic state, prompt text, waiting message)
+_TOPIC_PROMPTS = {
+    "newpost:poll": ("poll", PollStates.waiting_for_topic, _POLL_PROMPT_TEXT, "Жду тему опроса..."),
+    "newpost:tip": ("tip", TipStates.waiting_for_topic, _TIP_PROMPT_TEXT, "Жду тему совета..."),
+    "newpost:lifehack": (
+        "lifehack", LifehackStates.waiting_for_topic, _LIFEHACK_PROMPT_TEXT, "Жду тему лайфхака..."
+    ),
+}
 
 
-@router.callback_query(F.data == "newpost:tip")
-async def cb_newpost_tip(callback: CallbackQuery, state: FSMContext) -> None:
-    """Start cooking tip creation."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
+@routes.exact(*_TOPIC_PROMPTS)
+async def cb_newpost_topic(callback: CallbackQuery, state: FSMContext) -> None:
+    """Start poll, cooking tip or kitchen lifehack creation."""
+    category, topic_state, prompt_text, waiting_text = _TOPIC_PROMPTS[callback.data]
     
-    try:
-        await callback.answer()
-        await state.update_data(category="tip")
-        await state.set_state(TipStates.waiting_for_topic)
-        
-        await callback.message.edit_text(
-            "💡 <b>Кулинарный совет</b>\n\n"
-            "Напишите тему совета или нажмите «Пропустить».\n\n"
-            "<i>Примеры:</i>\n"
-            "• Как правильно варить рис\n"
-            "• Секреты сочного мяса\n"
-            "• Как хранить зелень",
-            parse_mode="HTML"
-        )
-        
-        await callback.message.answer(
-            "Жду тему совета...",
-            reply_markup=skip_keyboard()
-        )
-        
-    except Exception as e:
-        logger.error(f"Error in cb_newpost_tip: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
-
-
-@router.callback_query(F.data == "newpost:lifehack")
-async def cb_newpost_lifehack(callback: CallbackQuery, state: FSMContext) -> None:
-    """Start kitchen lifehack creation."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
+    await state.update_data(category=category)
+    await state.set_state(topic_state)
     
-    try:
-        await callback.answer()
-        await state.update_data(category="lifehack")
-        await state.set_state(LifehackStates.waiting_for_topic)
-        
-        await callback.message.edit_text(
-            "🔧 <b>Кухонный лайфхак</b>\n\n"
-            "Напишите тему лайфхака или нажмите «Пропустить».\n\n"
-            "<i>Примеры:</i>\n"
-            "• Как быстро почистить чеснок\n"
-            "• Лайфхаки с микроволновкой\n"
-            "• Как сохранить продукты свежими",
+    # Answer, edit the prompt and send the reply keyboard concurrently
+    await asyncio.gather(
+        callback.answer(),
+        callback.message.edit_text(
+            prompt_text,
             parse_mode="HTML"
-        )
-        
-        await callback.message.answer(
-            "Жду тему лайфхака...",
+        ),
+        callback.message.answer(
+            waiting_text,
             reply_markup=skip_keyboard()
         )
-        
-    except Exception as e:
-        logger.error(f"Error in cb_newpost_lifehack: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
+    )
 
 
-@router.callback_query(F.data.startswith("recipe:"))
-async def cb_recipe_category(callback: CallbackQuery, state: FSMContext) -> None:
+@routes.prefix("recipe:")
+async def cb_recipe_category(callback: CallbackQuery, state: FSMContext, route_arg: str) -> None:
     """Handle recipe category selection - show confirmation step."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
+    category = route_arg
     
-    try:
-        category = callback.data.split(":")[1]
-        
-        category_names = {
-            "pp": "🥗 ПП",
-            "keto": "🥑 Кето",
-            "vegan": "🌱 Веган",
-            "detox": "🍵 Детокс",
-            "breakfast": "🍳 Завтраки",
-            "dessert": "🍰 ПП-десерты",
-            "smoothie": "🥤 Смузи",
-            "soup": "🥣 Супы"
-        }
-        
-        category_name = category_names.get(category, category)
-        
-        # Save category to state for confirmation step
-        await state.update_data(recipe_category=category)
-        await state.set_state(RecipeStates.confirming)
-        
-        await callback.answer()
-        
-        # Show confirmation with options
-        await callback.message.edit_text(
-            f"📂 <b>Категория: {category_name}</b>\n\n"
-            f"Выберите действие:\n"
-            f"• <b>Сгенерировать</b> — сразу создать пост\n"
-            f"• <b>Добавить идею</b> — уточнить рецепт\n"
-            f"• <b>Добавить фото</b> — использовать своё фото",
-            parse_mode="HTML",
-            reply_markup=recipe_confirm_keyboard(category)
-        )
-        
-        logger.info(f"{mask_user_id(callback.from_user.id, config.debug_mode)} selected recipe: {category}")
-        
-    except Exception as e:
-        logger.error(f"Error in cb_recipe_category: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
+    category_name = _RECIPE_CATEGORY_LABELS.get(category, category)
+    
+    # Save category to state for confirmation step
+    await state.update_data(recipe_category=category)
+    await state.set_state(RecipeStates.confirming)
+    
+    # Show confirmation with options
+    await _answer_and_show(
+        callback,
+        f"📂 <b>Категория: {category_name}</b>\n\n"
+        f"Выберите действие:\n"
+        f"• <b>Сгенерировать</b> — сразу создать пост\n"
+        f"• <b>Добавить идею</b> — уточнить рецепт\n"
+        f"• <b>Добавить фото</b> — использовать своё фото",
+        recipe_confirm_keyboard(category)
+    )
+    
+    logger.info("%s selected recipe: %s", mask_user_id(callback.from_user.id, _DEBUG_MODE), category)
 
 
-@router.callback_query(F.data.startswith("recipe_gen:"))
-async def cb_recipe_generate(callback: CallbackQuery, state: FSMContext) -> None:
+@routes.prefix("recipe_gen:")
+async def cb_recipe_generate(callback: CallbackQuery, state: FSMContext, route_arg: str) -> None:
     """Generate recipe with current settings."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
+    if _gen_sem.locked():
+        await callback.answer(_GENERATION_BUSY_TEXT, show_alert=True)
         return
     
-    try:
-        category = callback.data.split(":")[1]
-        data = await state.get_data()
-        custom_idea = data.get("recipe_idea")
-        
-        category_names = {
-            "pp": "ПП",
-            "keto": "Кето",
-            "vegan": "Веган",
-            "detox": "Детокс",
-            "breakfast": "Завтраки",
-            "dessert": "ПП-десерты",
-            "smoothie": "Смузи",
-            "soup": "Супы"
-        }
-        category_name = category_names.get(category, category)
-        
-        await callback.answer(f"🍳 Генерирую {category_name} рецепт...")
-        await state.clear()
-        
-        update_user_activity(
-            user_id=callback.from_user.id,
-            first_name=callback.from_user.first_name,
-            username=callback.from_user.username,
-            action=f"recipe_{category}"
-        )
-        
-        await callback.message.edit_text(
+    category = route_arg
+    data = await state.get_data()
+    custom_idea = data.get("recipe_idea")
+    
+    category_name = _RECIPE_CATEGORY_NAMES.get(category, category)
+    
+    await state.clear()
+    
+    _track(callback, f"recipe_{category}")
+    
+    # Answer the callback and show the loading state concurrently
+    await asyncio.gather(
+        callback.answer(f"🍳 Генерирую {category_name} рецепт..."),
+        callback.message.edit_text(
             f"⏳ <b>Генерирую {category_name} рецепт...</b>\n\n"
             f"{'📝 С идеей: ' + custom_idea[:50] + '...' if custom_idea else ''}\n"
             f"Это может занять 1-2 минуты.",
             parse_mode="HTML"
         )
-        
-        # Generate recipe post
-        from services.post_service import post_to_channel
-        
+    )
+    
+    # Generate recipe post
+    async with _gen_sem:
         success, post_id = await post_to_channel(
             bot=callback.bot,
             channel_id=config.channel_id,
@@ -818,41 +863,33 @@ async def cb_recipe_generate(callback: CallbackQuery, state: FSMContext) -> None
             recipe_category=category,
             custom_idea=custom_idea
         )
-        
-        if success and post_id:
-            try:
-                await callback.message.delete()
-            except:
-                pass
-            logger.info(f"Recipe post ({category}) generated: {post_id}")
-        else:
-            await callback.message.edit_text(
-                f"❌ <b>Не удалось сгенерировать {category_name} рецепт</b>\n\n"
-                f"Попробуйте позже.",
-                parse_mode="HTML",
-                reply_markup=recipe_category_keyboard()
-            )
-        
-    except Exception as e:
-        logger.error(f"Error in cb_recipe_generate: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
+    
+    if success and post_id:
+        try:
+            await callback.message.delete()
+        except:
+            pass
+        logger.info("Recipe post (%s) generated: %s", category, post_id)
+    else:
+        await callback.message.edit_text(
+            f"❌ <b>Не удалось сгенерировать {category_name} рецепт</b>\n\n"
+            f"Попробуйте позже.",
+            parse_mode="HTML",
+            reply_markup=recipe_category_keyboard()
+        )
 
 
-@router.callback_query(F.data.startswith("recipe_idea:"))
-async def cb_recipe_add_idea(callback: CallbackQuery, state: FSMContext) -> None:
+@routes.prefix("recipe_idea:")
+async def cb_recipe_add_idea(callback: CallbackQuery, state: FSMContext, route_arg: str) -> None:
     """Ask for custom idea for recipe."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
+    category = route_arg
+    await state.update_data(recipe_category=category)
+    await state.set_state(RecipeStates.waiting_for_custom_idea)
     
-    try:
-        category = callback.data.split(":")[1]
-        await state.update_data(recipe_category=category)
-        await state.set_state(RecipeStates.waiting_for_custom_idea)
-        
-        await callback.answer()
-        
-        await callback.message.edit_text(
+    # Answer, edit the prompt and send the reply keyboard concurrently
+    await asyncio.gather(
+        callback.answer(),
+        callback.message.edit_text(
             "✏️ <b>Добавьте свою идею</b>\n\n"
             "Напишите, какой именно рецепт вы хотите.\n\n"
             "<i>Например:</i>\n"
@@ -860,183 +897,156 @@ async def cb_recipe_add_idea(callback: CallbackQuery, state: FSMContext) -> None
             "• Быстрый завтрак за 5 минут\n"
             "• Что-то с авокадо",
             parse_mode="HTML"
-        )
-        
-        await callback.message.answer(
+        ),
+        callback.message.answer(
             "Жду вашу идею...",
             reply_markup=cancel_keyboard()
         )
-        
-    except Exception as e:
-        logger.error(f"Error in cb_recipe_add_idea: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
+    )
 
 
-@router.callback_query(F.data.startswith("recipe_photo:"))
-async def cb_recipe_add_photo(callback: CallbackQuery, state: FSMContext) -> None:
+@routes.prefix("recipe_photo:")
+async def cb_recipe_add_photo(callback: CallbackQuery, state: FSMContext, route_arg: str) -> None:
     """Ask for custom photo for recipe."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
+    category = route_arg
+    await state.update_data(recipe_category=category)
+    await state.set_state(RecipeStates.waiting_for_custom_photo)
     
-    try:
-        category = callback.data.split(":")[1]
-        await state.update_data(recipe_category=category)
-        await state.set_state(RecipeStates.waiting_for_custom_photo)
-        
-        await callback.answer()
-        
-        await callback.message.edit_text(
+    # Answer, edit the prompt and send the reply keyboard concurrently
+    await asyncio.gather(
+        callback.answer(),
+        callback.message.edit_text(
             "📷 <b>Отправьте фото</b>\n\n"
             "Это фото будет использовано вместо сгенерированного.",
             parse_mode="HTML"
-        )
-        
-        await callback.message.answer(
+        ),
+        callback.message.answer(
             "Жду фото...",
             reply_markup=cancel_keyboard()
         )
-        
-    except Exception as e:
-        logger.error(f"Error in cb_recipe_add_photo: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
+    )
 
 
 # ============================================
 # NEW POST PROMPT CALLBACKS
 # ============================================
 
-@router.callback_query(F.data == "newpost_prompt:custom")
+@routes.exact("newpost_prompt:custom")
 async def cb_newpost_prompt_custom(callback: CallbackQuery, state: FSMContext) -> None:
     """User wants to provide custom prompt."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
+    await state.set_state(NewPostStates.waiting_for_prompt)
     
-    try:
-        await callback.answer()
-        await state.set_state(NewPostStates.waiting_for_prompt)
-        
-        await callback.message.edit_text(
-            "✏️ <b>Введите промпт</b>\n\n"
-            "Опишите, что именно должно быть в посте.\n"
-            "Бот учтёт ваши пожелания при генерации.\n\n"
-            "Отправьте /cancel для отмены.",
-            parse_mode="HTML"
-        )
-        
-    except Exception as e:
-        logger.error(f"Error in cb_newpost_prompt_custom: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
+    await _answer_and_show(
+        callback,
+        "✏️ <b>Введите промпт</b>\n\n"
+        "Опишите, что именно должно быть в посте.\n"
+        "Бот учтёт ваши пожелания при генерации.\n\n"
+        "Отправьте /cancel для отмены."
+    )
 
 
-@router.callback_query(F.data == "newpost_prompt:auto")
+@routes.exact("newpost_prompt:auto")
 async def cb_newpost_prompt_auto(callback: CallbackQuery, state: FSMContext) -> None:
     """User chose automatic generation."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
+    await callback.answer("⏳ Генерирую...")
     
-    try:
-        await callback.answer("⏳ Генерирую...")
-        
-        # Get stored data and generate
-        data = await state.get_data()
-        category = data.get("category", "pp")
-        user_idea = data.get("user_idea", "")
-        
-        await state.clear()
-        
-        await callback.message.edit_text(
-            "⏳ <b>Генерирую пост...</b>\n\n"
-            "Это может занять 1-2 минуты.",
-            parse_mode="HTML"
-        )
-        
-        from services.post_service import post_to_channel
-        
-        success, post_id = await post_to_channel(
-            bot=callback.bot,
-            channel_id=config.channel_id,
-            preview_mode=True,
-            admin_id=callback.from_user.id,
-            recipe_category=category,
-            custom_idea=user_idea if user_idea else None
-        )
-        
-        if success and post_id:
-            try:
-                await callback.message.delete()
-            except:
-                pass
-            logger.info(f"Auto post generated: {post_id}")
-        else:
-            await callback.message.edit_text(
-                "❌ Не удалось сгенерировать пост. Попробуйте позже.",
-                parse_mode="HTML"
-            )
-            
-    except Exception as e:
-        logger.error(f"Error in cb_newpost_prompt_auto: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
+    # Get stored data and generate
+    data = await state.get_data()
+    category = data.get("category", "pp")
+    user_idea = data.get("user_idea", "")
+    
+    await state.clear()
+    
+    await callback.message.edit_text(
+        "⏳ <b>Генерирую пост...</b>\n\n"
+        "Это может занять 1-2 минуты.",
+        parse_mode="HTML"
+    )
+    
+    success, post_id = await post_to_channel(
+        bot=callback.bot,
+        channel_id=config.channel_id,
+        preview_mode=True,
+        admin_id=callback.from_user.id,
+        recipe_category=category,
+        custom_idea=user_idea if user_idea else None
+    )
+    
+    if success and post_id:
+        try:
+            await callback.message.delete()
+        except:
+            pass
+        logger.info("Auto post generated: %s", post_id)
+    else:
+        await callback.message.edit_text(
+            "❌ Не удалось сгенерировать пост. Попробуйте позже.",
+            parse_mode="HTML"
+        )
 
 
 # ============================================
 # TEST CALLBACKS
 # ============================================
 
-@router.callback_query(F.data == "test_holidays")
+def _holidays_text(today: date, holidays: list) -> str:
+    """Format the holidays test result."""
+    if not holidays:
+        return _NO_HOLIDAYS_TEXT
+    
+    # Collect fragments and join once instead of repeated concatenation
+    parts = [f"🎉 <b>Праздники на {today.strftime('%d.%m.%Y')}:</b>\n\n"]
+    parts.extend(
+        f"{i}. {holiday.get('name', 'Без названия')}\n"
+        for i, holiday in enumerate(holidays[:5], 1)
+    )
+    
+    if len(holidays) > 5:
+        parts.append(f"\n... и ещё {len(holidays) - 5}")
+    
+    parts.append(f"\n\n✅ <b>Всего:</b> {len(holidays)} праздников")
+    return "".join(parts)
+
+
+# "admin_test_holidays" is the legacy admin keyboard's button
+@routes.exact("test_holidays", "admin_test_holidays")
 async def cb_test_holidays(callback: CallbackQuery) -> None:
     """Handle 'Тест праздников' button - test holidays from JSON."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
-    
     try:
-        await callback.answer("🔍 Загружаю праздники...")
-        
-        update_user_activity(
-            user_id=callback.from_user.id,
-            first_name=callback.from_user.first_name,
-            username=callback.from_user.username,
-            action="cb_test_holidays"
-        )
-        
-        # Show loading state
-        await callback.message.edit_text(
-            "🔍 <b>Загружаю праздники...</b>",
-            parse_mode="HTML"
-        )
+        _track(callback, "cb_test_holidays")
         
-        # Fetch holidays from JSON
-        from services.holidays_api import fetch_holidays_for_date
         today = date.today()
-        holidays = await fetch_holidays_for_date(today)
         
-        if holidays:
-            holidays_text = f"🎉 <b>Праздники на {today.strftime('%d.%m.%Y')}:</b>\n\n"
-            
-            for i, holiday in enumerate(holidays[:5], 1):
-                name = holiday.get("name", "Без названия")
-                holidays_text += f"{i}. {name}\n"
-            
-            if len(holidays) > 5:
-                holidays_text += f"\n... и ещё {len(holidays) - 5}"
-            
-            holidays_text += f"\n\n✅ <b>Всего:</b> {len(holidays)} праздников"
+        # Repeat presses on the same day are served from the holidays cache;
+        # the message may already show this result, so skip a no-op edit
+        holidays = get_cached_holidays(today)
+        if holidays is not None:
+            await _answer_and_show(
+                callback,
+                _holidays_text(today, holidays),
+                reply_markup=neural_tests_keyboard()
+            )
         else:
-            holidays_text = "❌ <b>Праздники не найдены</b>\n\nПроверьте файл data/food_holidays.json"
-        
-        await callback.message.edit_text(
-            holidays_text,
-            parse_mode="HTML",
-            reply_markup=neural_tests_keyboard()
-        )
+            # Answer the callback and show the loading state concurrently
+            await asyncio.gather(
+                callback.answer("🔍 Загружаю праздники..."),
+                callback.message.edit_text(
+                    "🔍 <b>Загружаю праздники...</b>",
+                    parse_mode="HTML"
+                )
+            )
+            holidays = await fetch_holidays_for_date(today)
+            
+            await callback.message.edit_text(
+                _holidays_text(today, holidays),
+                parse_mode="HTML",
+                reply_markup=neural_tests_keyboard()
+            )
         
-        logger.info(f"{mask_user_id(callback.from_user.id, config.debug_mode)} tested holidays: {len(holidays) if holidays else 0} found")
+        logger.info("%s tested holidays: %d found", mask_user_id(callback.from_user.id, _DEBUG_MODE), len(holidays) if holidays else 0)
         
     except Exception as e:
-        logger.error(f"Error in cb_test_holidays: {e}", exc_info=True)
+        logger.error("Error in cb_test_holidays: %s", e, exc_info=True)
         await callback.message.edit_text(
             f"⚠️ <b>Ошибка:</b>\n\n{str(e)[:200]}",
             parse_mode="HTML",
@@ -1044,42 +1054,28 @@ async def cb_test_holidays(callback: CallbackQuery) -> None:
         )
 
 
-@router.callback_query(F.data == "test_gpt")
+@routes.exact("test_gpt")
 async def cb_test_gpt(callback: CallbackQuery) -> None:
     """Handle 'Тест GPT-4o mini' button - test AI content generation."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
-    
     try:
-        await callback.answer("🤖 Генерирую контент...")
+        _track(callback, "cb_test_gpt")
         
-        update_user_activity(
-            user_id=callback.from_user.id,
-            first_name=callback.from_user.first_name,
-            username=callback.from_user.username,
-            action="cb_test_gpt"
+        # Answer the callback and show the loading state concurrently
+        await asyncio.gather(
+            callback.answer("🤖 Генерирую контент..."),
+            callback.message.edit_text(
+                _GPT_LOADING_TEXT,
+                parse_mode="HTML"
+            )
         )
         
-        await callback.message.edit_text(
-            "🤖 <b>Генерирую тестовый контент...</b>\n\n"
-            "Это может занять 10-30 секунд.",
-            parse_mode="HTML"
+        # Generate content; errors surface here instead of the canned fallback
+        # greeting, so a failed call is neither shown nor cached as a success
+        greeting = await _single_flight(
+            "test_gpt", TEST_RESULT_TTL, lambda: generate_greeting(fallback=False)
         )
         
-        # Generate content
-        from services.ai_content import generate_greeting
-        greeting = await generate_greeting()
-        
-        result_text = f"""
-🤖 <b>Тест GPT-4o mini</b>
-
-<b>Сгенерированное приветствие:</b>
-
-{greeting}
-
-✅ <i>AI работает корректно!</i>
-"""
+        result_text = _GPT_RESULT_TEMPLATE.format(greeting=greeting)
         
         await callback.message.edit_text(
             result_text,
@@ -1087,10 +1083,10 @@ async def cb_test_gpt(callback: CallbackQuery) -> None:
             reply_markup=back_keyboard()
         )
         
-        logger.info(f"{mask_user_id(callback.from_user.id, config.debug_mode)} tested GPT-4o mini")
+        logger.info("%s tested GPT-4o mini", mask_user_id(callback.from_user.id, _DEBUG_MODE))
         
     except Exception as e:
-        logger.error(f"Error in cb_test_gpt: {e}", exc_info=True)
+        logger.error("Error in cb_test_gpt: %s", e, exc_info=True)
         await callback.message.edit_text(
             f"⚠️ <b>Ошибка GPT-4o mini:</b>\n\n{str(e)[:200]}",
             parse_mode="HTML",
@@ -1098,65 +1094,59 @@ async def cb_test_gpt(callback: CallbackQuery) -> None:
         )
 
 
-@router.callback_query(F.data == "test_dalle")
+@routes.exact("test_dalle")
 async def cb_test_dalle(callback: CallbackQuery) -> None:
     """Handle 'Тест DALL-E' button - generate test image."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
-    
     try:
-        await callback.answer("🎨 Генерирую изображение...")
+        _track(callback, "cb_test_dalle")
         
-        update_user_activity(
-            user_id=callback.from_user.id,
-            first_name=callback.from_user.first_name,
-            username=callback.from_user.username,
-            action="cb_test_dalle"
-        )
-        
-        await callback.message.edit_text(
-            "🎨 <b>Генерирую тестовое изображение...</b>\n\n"
-            "Это может занять 30-60 секунд.\n"
-            "Стоимость: ~$0.04",
-            parse_mode="HTML"
-        )
-        
-        # Generate image
-        from services.image_generator import generate_food_image
-        image_bytes = await generate_food_image(
-            recipe_name="Test Image",
-            english_prompt="healthy colorful salad bowl, appetizing"
+        # Answer the callback and show the loading state concurrently
+        await asyncio.gather(
+            callback.answer("🎨 Генерирую изображение..."),
+            callback.message.edit_text(
+                _DALLE_LOADING_TEXT,
+                parse_mode="HTML"
+            )
         )
         
-        if image_bytes:
-            # Send image
-            photo = BufferedInputFile(image_bytes, filename="test_dalle.jpg")
-            await callback.message.answer_photo(
-                photo=photo,
-                caption="🎨 <b>Тестовое изображение DALL-E 3</b>\n\n✅ Генерация работает корректно!",
-                parse_mode="HTML"
+        # Generate image. DALL-E returns a URL, which is streamed to Telegram
+        # instead of being downloaded into memory first; Flux returns bytes.
+        prompt = "healthy colorful salad bowl, appetizing"
+        if get_settings().image_model == ImageModel.DALLE3.value:
+            image_url = await generate_dalle_image_url(prompt)
+            photo = URLInputFile(image_url, filename="test_dalle.jpg") if image_url else None
+        else:
+            image_bytes = await generate_food_image(
+                recipe_name="Test Image",
+                english_prompt=prompt
             )
-            
-            # Edit original message
-            await callback.message.edit_text(
-                "✅ <b>Изображение сгенерировано!</b>\n\n"
-                "Смотрите выше ⬆️",
-                parse_mode="HTML",
-                reply_markup=back_keyboard()
+            photo = BufferedInputFile(image_bytes, filename="test_dalle.jpg") if image_bytes else None
+        
+        if photo:
+            # Send the image and update the original message concurrently
+            await asyncio.gather(
+                callback.message.answer_photo(
+                    photo=photo,
+                    caption=_DALLE_CAPTION,
+                    parse_mode="HTML"
+                ),
+                callback.message.edit_text(
+                    _IMAGE_DONE_TEXT,
+                    parse_mode="HTML",
+                    reply_markup=back_keyboard()
+                )
             )
             
-            logger.info(f"{mask_user_id(callback.from_user.id, config.debug_mode)} tested DALL-E 3 successfully")
+            logger.info("%s tested DALL-E 3 successfully", mask_user_id(callback.from_user.id, _DEBUG_MODE))
         else:
             await callback.message.edit_text(
-                "❌ <b>Не удалось сгенерировать изображение</b>\n\n"
-                "Проверьте баланс OpenAI и API ключ.",
+                _DALLE_FAILED_TEXT,
                 parse_mode="HTML",
                 reply_markup=back_keyboard()
             )
         
     except Exception as e:
-        logger.error(f"Error in cb_test_dalle: {e}", exc_info=True)
+        logger.error("Error in cb_test_dalle: %s", e, exc_info=True)
         await callback.message.edit_text(
             f"⚠️ <b>Ошибка DALL-E:</b>\n\n{str(e)[:200]}",
             parse_mode="HTML",
@@ -1164,75 +1154,78 @@ async def cb_test_dalle(callback: CallbackQuery) -> None:
         )
 
 
-@router.callback_query(F.data == "my_stats")
+@routes.exact("my_stats")
 async def cb_my_stats(callback: CallbackQuery) -> None:
     """Handle 'Моя статистика' button - show user stats."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
+    _track(callback, "cb_my_stats")
     
-    try:
-        await callback.answer()
-        
-        update_user_activity(
-            user_id=callback.from_user.id,
-            first_name=callback.from_user.first_name,
-            username=callback.from_user.username,
-            action="cb_my_stats"
-        )
-        
-        stats_text = format_user_stats(callback.from_user.id)
-        
-        await callback.message.edit_text(
-            stats_text,
-            parse_mode="HTML",
-            reply_markup=back_keyboard()
-        )
-        
-        logger.info(f"{mask_user_id(callback.from_user.id, config.debug_mode)} viewed their stats")
-        
-    except Exception as e:
-        logger.error(f"Error in cb_my_stats: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
+    stats_text = format_user_stats(callback.from_user.id)
+    
+    await _answer_and_show(callback, stats_text, back_keyboard())
+    
+    logger.info("%s viewed their stats", mask_user_id(callback.from_user.id, _DEBUG_MODE))
 
 
 # ============================================
 # POST CONFIRMATION CALLBACKS
 # ============================================
 
-@router.callback_query(F.data == "confirm_post")
+# "admin_post_now" is the legacy admin keyboard's button
+@routes.exact("confirm_post", "admin_post_now")
 async def cb_confirm_post(callback: CallbackQuery) -> None:
     """Handle post confirmation."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
-    
     try:
-        await callback.answer("📤 Отправляю пост...")
-        
-        update_user_activity(
-            user_id=callback.from_user.id,
-            first_name=callback.from_user.first_name,
-            username=callback.from_user.username,
-            action="cb_confirm_post"
+        _track(callback, "cb_confirm_post")
+        
+        # Answer the callback and show the loading state concurrently
+        await asyncio.gather(
+            callback.answer("📤 Отправляю пост..."),
+            callback.message.edit_text(
+                "⏳ <b>Генерирую и отправляю пост...</b>\n\n"
+                "Это может занять 1-2 минуты.",
+                parse_mode="HTML"
+            )
         )
         
+        # Generate in the background so the handler returns right away
+        task = asyncio.create_task(_run_confirmed_post(callback))
+        _post_tasks.add(task)
+        task.add_done_callback(_post_tasks.discard)
+        
+    except Exception as e:
+        logger.error("Error in cb_confirm_post: %s", e, exc_info=True)
         await callback.message.edit_text(
-            "⏳ <b>Генерирую и отправляю пост...</b>\n\n"
-            "Это может занять 1-2 минуты.",
+            f"⚠️ <b>Ошибка:</b> {str(e)[:100]}",
             parse_mode="HTML"
         )
+
+
+async def _publish_pending(bot: Bot, post_id: str) -> bool:
+    """Publish a pending post once no other channel publish is running."""
+    async with channel_post_sem:
+        return await publish_pending_post(
+            bot=bot,
+            post_id=post_id,
+            channel_id=config.channel_id
+        )
+
+
+async def _run_confirmed_post(callback: CallbackQuery) -> None:
+    """Publish a confirmed post (one pipeline at a time) and report the result."""
+    try:
+        if channel_post_sem.locked():
+            await callback.message.edit_text(
+                "⏳ <b>Пост в очереди...</b>\n\n"
+                "Дождитесь завершения текущей публикации.",
+                parse_mode="HTML"
+            )
         
-        from services.post_service import post_to_channel
-        from handlers.admin import update_last_post_status
-        from services.user_service import increment_posts_triggered
-        
-        bot = callback.message.bot
-        success = await post_to_channel(bot, config.channel_id)
+        async with channel_post_sem:
+            success, _ = await post_to_channel(callback.bot, config.channel_id)
         
         if success:
             update_last_post_status(success=True)
-            increment_posts_triggered(callback.from_user.id)
+            track_posts_triggered(callback.from_user.id)
             await callback.message.edit_text(
                 "✅ <b>Пост успешно опубликован!</b>",
                 parse_mode="HTML"
@@ -1245,124 +1238,71 @@ async def cb_confirm_post(callback: CallbackQuery) -> None:
                 parse_mode="HTML"
             )
         
-        logger.info(f"{mask_user_id(callback.from_user.id, config.debug_mode)} confirmed post: {'success' if success else 'failed'}")
+        logger.info("%s confirmed post: %s", mask_user_id(callback.from_user.id, _DEBUG_MODE), "success" if success else "failed")
         
     except Exception as e:
-        logger.error(f"Error in cb_confirm_post: {e}", exc_info=True)
+        logger.error("Error in confirmed post: %s", e, exc_info=True)
         await callback.message.edit_text(
             f"⚠️ <b>Ошибка:</b> {str(e)[:100]}",
             parse_mode="HTML"
         )
 
 
-@router.callback_query(F.data == "cancel_post")
+@routes.exact("cancel_post")
 async def cb_cancel_post(callback: CallbackQuery) -> None:
     """Handle post cancellation."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
-    
     try:
-        await callback.answer("Отменено")
+        if _is_repeat_edit(callback.message, _POST_CANCELLED_TEXT):
+            await callback.answer("Отменено")
+            return
         
-        await callback.message.edit_text(
-            "❌ <b>Отправка поста отменена.</b>",
-            parse_mode="HTML"
+        # Answer the callback and update the message concurrently
+        await asyncio.gather(
+            callback.answer("Отменено"),
+            callback.message.edit_text(
+                _POST_CANCELLED_TEXT,
+                parse_mode="HTML"
+            )
         )
         
-        logger.info(f"{mask_user_id(callback.from_user.id, config.debug_mode)} cancelled post")
+        logger.info("%s cancelled post", mask_user_id(callback.from_user.id, _DEBUG_MODE))
         
     except Exception as e:
-        logger.error(f"Error in cb_cancel_post: {e}", exc_info=True)
+        logger.error("Error in cb_cancel_post: %s", e, exc_info=True)
 
 
 # ============================================
 # LEGACY ADMIN CALLBACKS (for compatibility)
 # ============================================
 
-@router.callback_query(F.data == "admin_post_now")
-async def cb_admin_post_now(callback: CallbackQuery) -> None:
-    """Legacy callback for admin post button."""
-    await cb_confirm_post(callback)
-
-
-@router.callback_query(F.data == "admin_status")
+@routes.exact("admin_status")
 async def cb_admin_status(callback: CallbackQuery) -> None:
     """Legacy callback for admin status button."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
-    
-    try:
-        await callback.answer()
-        
-        # Import and call status logic
-        from handlers.admin import bot_start_time, last_post_status
-        
-        uptime = datetime.now() - bot_start_time
-        days = uptime.days
-        hours, remainder = divmod(uptime.seconds, 3600)
-        minutes, _ = divmod(remainder, 60)
-        
-        status_text = f"""
-📊 <b>Статус бота</b>
-
-⏱ <b>Аптайм:</b> {days}д {hours}ч {minutes}м
-📅 <b>Время поста:</b> {config.morning_post_time} (МСК)
-📢 <b>Канал:</b> {mask_channel_id(config.channel_id, config.debug_mode)}
-"""
-        
-        await callback.message.edit_text(
-            status_text,
-            parse_mode="HTML",
-            reply_markup=back_keyboard()
-        )
-        
-    except Exception as e:
-        logger.error(f"Error in cb_admin_status: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
-
-
-@router.callback_query(F.data == "admin_test_holidays")
-async def cb_admin_test_holidays(callback: CallbackQuery) -> None:
-    """Legacy callback for admin test holidays button."""
-    await cb_test_holidays(callback)
+    await _answer_and_show(callback, _status_text(), back_keyboard())
 
 
 # ============================================
 # POST PREVIEW CALLBACKS (New format)
 # ============================================
 
-@router.callback_query(F.data.startswith("publish:"))
-async def cb_publish_new(callback: CallbackQuery) -> None:
+@routes.prefix("publish:")
+async def cb_publish_new(callback: CallbackQuery, route_arg: str) -> None:
     """Handle '✅ Опубликовать' button - publish pending post (new format)."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
-    
     try:
-        post_id = callback.data.split(":")[1]
+        post_id = route_arg
         await callback.answer("📤 Публикую в канал...")
         
-        from services.post_service import publish_pending_post
-        from services.user_service import increment_posts_triggered
-        from handlers.admin import update_last_post_status
-        
-        success = await publish_pending_post(
-            bot=callback.bot,
-            post_id=post_id,
-            channel_id=config.channel_id
-        )
+        success = await _publish_pending(callback.bot, post_id)
         
         if success:
             update_last_post_status(success=True)
-            increment_posts_triggered(callback.from_user.id)
+            track_posts_triggered(callback.from_user.id)
             
             await callback.message.edit_caption(
                 caption="✅ <b>Пост успешно опубликован!</b>",
                 parse_mode="HTML"
             )
-            logger.info(f"Post {post_id} published by {mask_user_id(callback.from_user.id, config.debug_mode)}")
+            logger.info("Post %s published by %s", post_id, mask_user_id(callback.from_user.id, _DEBUG_MODE))
         else:
             update_last_post_status(success=False, error="Publish failed")
             await callback.message.edit_caption(
@@ -1371,200 +1311,159 @@ async def cb_publish_new(callback: CallbackQuery) -> None:
             )
             
     except Exception as e:
-        logger.error(f"Error in cb_publish_new: {e}", exc_info=True)
+        logger.error("Error in cb_publish_new: %s", e, exc_info=True)
         await callback.answer("⚠️ Ошибка при публикации", show_alert=True)
 
 
-@router.callback_query(F.data.startswith("edit:"))
-async def cb_edit_post(callback: CallbackQuery, state: FSMContext) -> None:
+@routes.prefix("edit:")
+async def cb_edit_post(callback: CallbackQuery, state: FSMContext, route_arg: str) -> None:
     """Handle '✏️ Редактировать' button - start editing post text."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
+    post_id = route_arg
+    
+    post_data = get_pending_post(post_id)
+    if not post_data:
+        await callback.answer("Пост не найден", show_alert=True)
         return
     
-    try:
-        post_id = callback.data.split(":")[1]
-        
-        from services.post_service import get_pending_post
-        from keyboards import editing_keyboard
-        
-        post_data = get_pending_post(post_id)
-        if not post_data:
-            await callback.answer("Пост не найден", show_alert=True)
-            return
-        
-        # Check if multi-post
-        is_multipost = post_data.get("is_multipost", False)
-        total_parts = post_data.get("total_parts", 1)
-        
-        if is_multipost and total_parts > 1:
-            # Ask which part to edit
-            await state.update_data(editing_post_id=post_id, total_parts=total_parts)
-            await state.set_state(EditPostStates.selecting_part)
-            
-            await callback.answer()
-            await callback.message.answer(
-                f"✏️ <b>Редактирование мульти-поста</b>\n\n"
-                f"Пост разделён на {total_parts} части.\n"
-                f"Введите номер части для редактирования (1-{total_parts}):\n\n"
-                f"Отправьте /cancel для отмены.",
-                parse_mode="HTML"
-            )
-        else:
-            # Single post - direct edit
-            await state.update_data(editing_post_id=post_id)
-            await state.set_state(EditPostStates.waiting_for_new_text)
-            
-            await callback.answer()
-            await callback.message.answer(
-                "✏️ <b>Режим редактирования</b>\n\n"
-                "Отправьте новый текст поста целиком.\n"
-                "Текущий текст будет заменён.\n\n"
-                "Отправьте /cancel для отмены.",
-                parse_mode="HTML",
-                reply_markup=editing_keyboard()
-            )
+    # Check if multi-post
+    is_multipost = post_data.get("is_multipost", False)
+    total_parts = post_data.get("total_parts", 1)
+    
+    if is_multipost and total_parts > 1:
+        # Ask which part to edit
+        await state.update_data(editing_post_id=post_id, total_parts=total_parts)
+        await state.set_state(EditPostStates.selecting_part)
         
-        logger.info(f"Editing started for post {post_id}")
+        await callback.answer()
+        await callback.message.answer(
+            f"✏️ <b>Редактирование мульти-поста</b>\n\n"
+            f"Пост разделён на {total_parts} части.\n"
+            f"Введите номер части для редактирования (1-{total_parts}):\n\n"
+            f"Отправьте /cancel для отмены.",
+            parse_mode="HTML"
+        )
+    else:
+        # Single post - direct edit
+        await state.update_data(editing_post_id=post_id)
+        await state.set_state(EditPostStates.waiting_for_new_text)
         
-    except Exception as e:
-        logger.error(f"Error in cb_edit_post: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
+        await callback.answer()
+        await callback.message.answer(
+            "✏️ <b>Режим редактирования</b>\n\n"
+            "Отправьте новый текст поста целиком.\n"
+            "Текущий текст будет заменён.\n\n"
+            "Отправьте /cancel для отмены.",
+            parse_mode="HTML",
+            reply_markup=editing_keyboard()
+        )
+    
+    logger.info("Editing started for post %s", post_id)
 
 
-@router.callback_query(F.data.startswith("regenerate:"))
-async def cb_regenerate_new(callback: CallbackQuery) -> None:
+@routes.prefix("regenerate:")
+async def cb_regenerate_new(callback: CallbackQuery, route_arg: str) -> None:
     """Handle '🔄 Заново' button - regenerate post (new format)."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
+    post_id = route_arg
+    await callback.answer("🔄 Генерирую заново...")
     
-    try:
-        post_id = callback.data.split(":")[1]
-        await callback.answer("🔄 Генерирую заново...")
-        
-        from services.post_service import generate_post_data, store_pending_post, _pending_posts
-        
-        # Show loading
-        try:
-            await callback.message.edit_caption(
-                caption="⏳ <b>Генерирую новый пост...</b>",
-                parse_mode="HTML"
-            )
-        except:
-            pass
-        
-        # Generate new post
-        post_data = await generate_post_data()
+    # Show loading while generation is already running
+    loading_task = asyncio.create_task(
+        callback.message.edit_caption(
+            caption="⏳ <b>Генерирую новый пост...</b>",
+            parse_mode="HTML"
+        )
+    )
+    loading_task.add_done_callback(_ignore_task_error)
+    
+    # Generate new post
+    post_data = await generate_post_data()
+    
+    # Let the loading edit land before the message is replaced
+    await asyncio.wait([loading_task])
+    
+    if post_data:
+        # Replace with same ID
+        _pending_posts[post_id] = post_data
         
-        if post_data:
-            # Replace with same ID
-            _pending_posts[post_id] = post_data
-            
-            # Send new preview
-            from services.post_service import send_preview_to_admin
-            await send_preview_to_admin(
+        # Send new preview and delete the old one concurrently
+        await asyncio.gather(
+            send_preview_to_admin(
                 bot=callback.bot,
                 admin_id=callback.from_user.id,
                 post_data=post_data,
                 reply_markup=preview_post_keyboard(post_id)
-            )
-            
-            try:
-                await callback.message.delete()
-            except:
-                pass
-        else:
-            await callback.message.edit_caption(
-                caption="❌ <b>Не удалось перегенерировать</b>",
-                parse_mode="HTML",
-                reply_markup=preview_post_keyboard(post_id)
-            )
-            
-    except Exception as e:
-        logger.error(f"Error in cb_regenerate_new: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
+            ),
+            callback.message.delete(),
+            return_exceptions=True
+        )
+    else:
+        await callback.message.edit_caption(
+            caption="❌ <b>Не удалось перегенерировать</b>",
+            parse_mode="HTML",
+            reply_markup=preview_post_keyboard(post_id)
+        )
 
 
-@router.callback_query(F.data.startswith("cancel:"))
-async def cb_cancel_new(callback: CallbackQuery) -> None:
+@routes.prefix("cancel:")
+async def cb_cancel_new(callback: CallbackQuery, route_arg: str) -> None:
     """Handle '❌ Отменить' button - cancel pending post (new format)."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
+    post_id = route_arg
     
-    try:
-        post_id = callback.data.split(":")[1]
-        
-        from services.post_service import remove_pending_post
-        remove_pending_post(post_id)
-        
+    remove_pending_post(post_id)
+    
+    if _is_repeat_edit(callback.message, _NEW_POST_CANCELLED_TEXT):
         await callback.answer("Отменено")
-        await callback.message.edit_caption(
-            caption="❌ <b>Публикация отменена</b>",
+        return
+    
+    # Answer the callback and update the preview message concurrently
+    await asyncio.gather(
+        callback.answer("Отменено"),
+        callback.message.edit_caption(
+            caption=_NEW_POST_CANCELLED_TEXT,
             parse_mode="HTML"
         )
-        
-        logger.info(f"Post {post_id} cancelled")
-        
-    except Exception as e:
-        logger.error(f"Error in cb_cancel_new: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
+    )
+    
+    logger.info("Post %s cancelled", post_id)
 
 
 # ============================================
 # POST PREVIEW CALLBACKS (Legacy format)
 # ============================================
 
-@router.callback_query(F.data.startswith("publish_post"))
-async def cb_publish_post(callback: CallbackQuery) -> None:
+@routes.exact("publish_post")
+@routes.prefix("publish_post:")
+async def cb_publish_post(callback: CallbackQuery, route_arg: str = "") -> None:
     """Handle '✅ Опубликовать в канал' button - publish pending post."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
-    
     try:
-        await callback.answer("📤 Публикую в канал...")
-        
-        # Extract post_id from callback data
-        parts = callback.data.split(":")
-        post_id = parts[1] if len(parts) > 1 else ""
+        post_id = route_arg
         
         if not post_id:
-            await callback.message.edit_caption(
-                caption="❌ <b>Ошибка:</b> Пост не найден.\n\nПопробуйте сгенерировать новый.",
-                parse_mode="HTML"
+            await asyncio.gather(
+                callback.answer("📤 Публикую в канал..."),
+                callback.message.edit_caption(
+                    caption="❌ <b>Ошибка:</b> Пост не найден.\n\nПопробуйте сгенерировать новый.",
+                    parse_mode="HTML"
+                )
             )
             return
         
-        update_user_activity(
-            user_id=callback.from_user.id,
-            first_name=callback.from_user.first_name,
-            username=callback.from_user.username,
-            action="publish_post"
-        )
-        
-        # Publish the pending post
-        from services.post_service import publish_pending_post
-        from services.user_service import increment_posts_triggered
-        from handlers.admin import update_last_post_status
+        _track(callback, "publish_post")
         
-        success = await publish_pending_post(
-            bot=callback.bot,
-            post_id=post_id,
-            channel_id=config.channel_id
-        )
+        # Answer first: a stale query must not fail a publish already under way
+        await callback.answer("📤 Публикую в канал...")
+        success = await _publish_pending(callback.bot, post_id)
         
         if success:
             update_last_post_status(success=True)
-            increment_posts_triggered(callback.from_user.id)
+            track_posts_triggered(callback.from_user.id)
             
             # Update the preview message
             await callback.message.edit_caption(
                 caption="✅ <b>Пост успешно опубликован в канале!</b>",
                 parse_mode="HTML"
             )
-            logger.info(f"{mask_user_id(callback.from_user.id, config.debug_mode)} published post {post_id}")
+            logger.info("%s published post %s", mask_user_id(callback.from_user.id, _DEBUG_MODE), post_id)
         else:
             update_last_post_status(success=False, error="Publish failed")
             await callback.message.edit_caption(
@@ -1573,83 +1472,61 @@ async def cb_publish_post(callback: CallbackQuery) -> None:
             )
         
     except Exception as e:
-        logger.error(f"Error in cb_publish_post: {e}", exc_info=True)
+        logger.error("Error in cb_publish_post: %s", e, exc_info=True)
         await callback.answer("⚠️ Ошибка при публикации", show_alert=True)
 
 
-@router.callback_query(F.data.startswith("cancel_preview"))
-async def cb_cancel_preview(callback: CallbackQuery) -> None:
+@routes.exact("cancel_preview")
+@routes.prefix("cancel_preview:")
+async def cb_cancel_preview(callback: CallbackQuery, route_arg: str = "") -> None:
     """Handle '❌ Отменить' button - cancel pending post."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
+    post_id = route_arg
     
-    try:
+    # Remove pending post if exists
+    if post_id:
+        remove_pending_post(post_id)
+    
+    _track(callback, "cancel_preview")
+    
+    if _is_repeat_edit(callback.message, _PREVIEW_CANCELLED_TEXT):
         await callback.answer("Отменено")
-        
-        # Extract post_id from callback data
-        parts = callback.data.split(":")
-        post_id = parts[1] if len(parts) > 1 else ""
-        
-        # Remove pending post if exists
-        if post_id:
-            from services.post_service import remove_pending_post
-            remove_pending_post(post_id)
-        
-        update_user_activity(
-            user_id=callback.from_user.id,
-            first_name=callback.from_user.first_name,
-            username=callback.from_user.username,
-            action="cancel_preview"
-        )
-        
-        # Update the preview message
-        await callback.message.edit_caption(
-            caption="❌ <b>Публикация отменена</b>\n\nИспользуйте меню для создания нового поста.",
+        return
+    
+    # Answer the callback and update the preview message concurrently
+    await asyncio.gather(
+        callback.answer("Отменено"),
+        callback.message.edit_caption(
+            caption=_PREVIEW_CANCELLED_TEXT,
             parse_mode="HTML"
         )
-        
-        logger.info(f"{mask_user_id(callback.from_user.id, config.debug_mode)} cancelled preview")
-        
-    except Exception as e:
-        logger.error(f"Error in cb_cancel_preview: {e}", exc_info=True)
-        await callback.answer("⚠️ Ошибка", show_alert=True)
+    )
+    
+    logger.info("%s cancelled preview", mask_user_id(callback.from_user.id, _DEBUG_MODE))
 
 
-@router.callback_query(F.data.startswith("regenerate_post"))
-async def cb_regenerate_post(callback: CallbackQuery) -> None:
+@routes.exact("regenerate_post")
+@routes.prefix("regenerate_post:")
+async def cb_regenerate_post(callback: CallbackQuery, route_arg: str = "") -> None:
     """Handle '🔄 Регенерировать' button - generate new post content."""
-    if not is_admin(callback.from_user.id):
-        await answer_unauthorized(callback)
-        return
-    
     try:
-        await callback.answer("🔄 Генерирую новый пост...")
-        
-        # Extract old post_id and remove it
-        parts = callback.data.split(":")
-        old_post_id = parts[1] if len(parts) > 1 else ""
+        # Remove the old pending post
+        old_post_id = route_arg
         
         if old_post_id:
-            from services.post_service import remove_pending_post
             remove_pending_post(old_post_id)
         
-        update_user_activity(
-            user_id=callback.from_user.id,
-            first_name=callback.from_user.first_name,
-            username=callback.from_user.username,
-            action="regenerate_post"
-        )
+        _track(callback, "regenerate_post")
         
-        # Update message to show loading
-        await callback.message.edit_caption(
-            caption="🔄 <b>Генерирую новый пост...</b>\n\nЭто может занять 1-2 минуты.",
-            parse_mode="HTML"
+        # Answer the callback and show the loading state concurrently
+        await asyncio.gather(
+            callback.answer("🔄 Генерирую новый пост..."),
+            callback.message.edit_caption(
+                caption="🔄 <b>Генерирую новый пост...</b>\n\nЭто может занять 1-2 минуты.",
+                parse_mode="HTML"
+            )
         )
         
         # Generate new post with preview
-        from services.post_service import post_to_channel
-        from keyboards import preview_post_keyboard
         
         success, new_post_id = await post_to_channel(
             bot=callback.bot,
@@ -1664,7 +1541,7 @@ async def cb_regenerate_post(callback: CallbackQuery) -> None:
                 await callback.message.delete()
             except Exception:
                 pass
-            logger.info(f"{mask_user_id(callback.from_user.id, config.debug_mode)} regenerated post, new_id: {new_post_id}")
+            logger.info("%s regenerated post, new_id: %s", mask_user_id(callback.from_user.id, _DEBUG_MODE), new_post_id)
         else:
             await callback.message.edit_caption(
                 caption="❌ <b>Не удалось сгенерировать новый пост.</b>\n\nПопробуйте позже.",
@@ -1672,7 +1549,7 @@ async def cb_regenerate_post(callback: CallbackQuery) -> None:
             )
         
     except Exception as e:
-        logger.error(f"Error in cb_regenerate_post: {e}", exc_info=True)
+        logger.error("Error in cb_regenerate_post: %s", e, exc_info=True)
         await callback.answer("⚠️ Ошибка при регенерации", show_alert=True)
 
 
@@ -1680,8 +1557,9 @@ async def cb_regenerate_post(callback: CallbackQuery) -> None:
 # CATCH-ALL CALLBACK HANDLER
 # ============================================
 
-@router.callback_query()
+@routes.fallback
 async def cb_unknown(callback: CallbackQuery) -> None:
     """Handle unknown callback queries."""
     await callback.answer("⚠️ Неизвестная команда", show_alert=True)
-    logger.warning(f"Unknown callback: {callback.data} from {mask_user_id(callback.from_user.id, config.debug_mode)}")
+    if logger.isEnabledFor(logging.WARNING):
+        logger.warning("Unknown callback: %s from %s", callback.data, mask_user_id(callback.from_user.id, _DEBUG_MODE))
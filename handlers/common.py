@@ -10,27 +10,90 @@ from aiogram.types import Message
 from aiogram.filters import Command
 
 from config import config
-from keyboards import main_menu_keyboard, settings_keyboard
-from services.user_service import update_user_activity
+from keyboards import main_menu_keyboard, settings_keyboard, preview_post_keyboard, new_post_category_keyboard
+from handlers.admin import cmd_status, send_access_denied
+from services.post_service import post_to_channel
+from services.settings_service import get_settings
+from services.user_service import track_user_activity
 from utils.logger import mask_user_id
 
 logger = logging.getLogger(__name__)
 router = Router(name="common")
 
 
-def is_admin(user_id: int) -> bool:
-    """Check if user is authorized admin."""
-    return config.is_admin(user_id)
+# Admin IDs frozenset, bound once for O(1) checks on the hot path
+_ADMINS = config.admin_user_ids
 
+# Debug mode is fixed at startup; bound once for the mask_user_id() log calls
+_DEBUG_MODE = config.debug_mode
 
-async def send_access_denied(message: Message) -> None:
-    """Send access denied message to unauthorized users."""
-    await message.answer(
-        "❌ <b>У вас нет доступа к боту</b>\n\n"
-        "Этот бот доступен только для администраторов.",
-        parse_mode="HTML"
+# Static message texts, built once at import
+_WELCOME_TEXT = """
+☀️ <b>Добро пожаловать в Utro Bot!</b>
+
+Я помогу вам публиковать ежедневные посты о кулинарных праздниках с ПП-рецептами.
+
+<b>Используйте меню внизу:</b>
+• ☀️ Утро сегодня — создать утренний пост
+• ✨ Новый пост — создать свой пост
+• 📊 Статус — информация о боте
+• ⚙️ Настройки — параметры бота
+• ❔ Помощь — справка
+"""
+
+_HELP_TEXT = """
+❔ <b>Справка по Utro Bot</b>
+
+<b>О боте:</b>
+Бот для публикации ежедневных постов о кулинарных праздниках с ПП-рецептами и AI-изображениями.
+
+<b>Кнопки меню:</b>
+
+☀️ <b>Утро сегодня</b>
+Создать утренний пост с праздниками, рецептом и картинкой
+
+✨ <b>Новый пост</b>
+Создать пост с выбором категории:
+• Рецепт — выбрать тип (ПП, Кето, Веган и др.)
+• Свой — написать свою идею для поста
+
+📊 <b>Статус</b>
+Информация о боте и расписании
+
+⚙️ <b>Настройки</b>
+• Изображения — вкл/выкл генерацию
+• Модель — DALL-E 3 или Flux
+• Шаблон — длина поста
+• Расписание — время автопостинга
+• Тесты нейросетей
+
+❔ <b>Помощь</b>
+Эта справка
+"""
+
+_NEW_POST_TEXT = "✨ <b>Новый пост</b>\n\nВыберите тип поста:"
+
+# Settings screen, filled per request with the current values
+_SETTINGS_TEMPLATE = """
+⚙️ <b>Настройки</b>
+
+<b>Текущие параметры:</b>
+🖼 Изображение: {img_status}
+🎨 Модель: {model_name}
+📝 Шаблон: {template_name}
+
+Выберите настройку для изменения:
+"""
+
+
+def _track(message: Message, action: str) -> None:
+    """Record the user's command without blocking the handler."""
+    track_user_activity(
+        user_id=message.from_user.id,
+        first_name=message.from_user.first_name,
+        username=message.from_user.username,
+        action=action
     )
-    logger.warning(f"Unauthorized access attempt from {mask_user_id(message.from_user.id, config.debug_mode)}")
 
 
 @router.message(Command("start"))
@@ -38,40 +101,22 @@ async def cmd_start(message: Message) -> None:
     """Handle /start command - welcome message with main menu."""
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await send_access_denied(message)
         return
     
     try:
-        # Update user activity
-        update_user_activity(
-            user_id=user_id,
-            first_name=message.from_user.first_name,
-            username=message.from_user.username,
-            action="/start"
-        )
+        _track(message, "/start")
         
-        welcome_text = """
-☀️ <b>Добро пожаловать в Utro Bot!</b>
-
-Я помогу вам публиковать ежедневные посты о кулинарных праздниках с ПП-рецептами.
-
-<b>Используйте меню внизу:</b>
-• ☀️ Утро сегодня — создать утренний пост
-• ✨ Новый пост — создать свой пост
-• 📊 Статус — информация о боте
-• ⚙️ Настройки — параметры бота
-• ❔ Помощь — справка
-"""
         await message.answer(
-            welcome_text, 
+            _WELCOME_TEXT,
             parse_mode="HTML",
             reply_markup=main_menu_keyboard()
         )
-        logger.info(f"{mask_user_id(user_id, config.debug_mode)} started the bot")
+        logger.info("%s started the bot", mask_user_id(user_id, _DEBUG_MODE))
         
     except Exception as e:
-        logger.error(f"Error in cmd_start: {e}", exc_info=True)
+        logger.error("Error in cmd_start: %s", e, exc_info=True)
         await message.answer(
             "⚠️ Произошла ошибка. Попробуйте позже.",
             reply_markup=main_menu_keyboard()
@@ -83,23 +128,18 @@ async def cmd_help(message: Message) -> None:
     """Handle /help command - bot description and features."""
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await send_access_denied(message)
         return
     
     try:
-        update_user_activity(
-            user_id=user_id,
-            first_name=message.from_user.first_name,
-            username=message.from_user.username,
-            action="/help"
-        )
+        _track(message, "/help")
         
         await show_help(message)
-        logger.info(f"{mask_user_id(user_id, config.debug_mode)} requested help")
+        logger.info("%s requested help", mask_user_id(user_id, _DEBUG_MODE))
         
     except Exception as e:
-        logger.error(f"Error in cmd_help: {e}", exc_info=True)
+        logger.error("Error in cmd_help: %s", e, exc_info=True)
         await message.answer(
             "⚠️ Произошла ошибка. Попробуйте позже.",
             reply_markup=main_menu_keyboard()
@@ -108,37 +148,8 @@ async def cmd_help(message: Message) -> None:
 
 async def show_help(message: Message) -> None:
     """Display help text."""
-    help_text = """
-❔ <b>Справка по Utro Bot</b>
-
-<b>О боте:</b>
-Бот для публикации ежедневных постов о кулинарных праздниках с ПП-рецептами и AI-изображениями.
-
-<b>Кнопки меню:</b>
-
-☀️ <b>Утро сегодня</b>
-Создать утренний пост с праздниками, рецептом и картинкой
-
-✨ <b>Новый пост</b>
-Создать пост с выбором категории:
-• Рецепт — выбрать тип (ПП, Кето, Веган и др.)
-• Свой — написать свою идею для поста
-
-📊 <b>Статус</b>
-Информация о боте и расписании
-
-⚙️ <b>Настройки</b>
-• Изображения — вкл/выкл генерацию
-• Модель — DALL-E 3 или Flux
-• Шаблон — длина поста
-• Расписание — время автопостинга
-• Тесты нейросетей
-
-❔ <b>Помощь</b>
-Эта справка
-"""
     await message.answer(
-        help_text, 
+        _HELP_TEXT,
         parse_mode="HTML",
         reply_markup=main_menu_keyboard()
     )
@@ -153,17 +164,12 @@ async def btn_post_today(message: Message) -> None:
     """Handle 'Утро сегодня' button - generate preview for today."""
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await send_access_denied(message)
         return
     
     try:
-        update_user_activity(
-            user_id=user_id,
-            first_name=message.from_user.first_name,
-            username=message.from_user.username,
-            action="btn_post_today"
-        )
+        _track(message, "btn_post_today")
         
         bot = message.bot
         
@@ -173,10 +179,7 @@ async def btn_post_today(message: Message) -> None:
             reply_markup=main_menu_keyboard()
         )
         
-        logger.info(f"{mask_user_id(user_id, config.debug_mode)} triggered today's post preview")
-        
-        from services.post_service import post_to_channel
-        from keyboards import preview_post_keyboard
+        logger.info("%s triggered today's post preview", mask_user_id(user_id, _DEBUG_MODE))
         
         success, post_id = await post_to_channel(
             bot=bot,
@@ -186,7 +189,7 @@ async def btn_post_today(message: Message) -> None:
         )
         
         if success and post_id:
-            logger.info(f"Preview generated, post_id: {post_id}")
+            logger.info("Preview generated, post_id: %s", post_id)
         else:
             await message.answer(
                 "❌ Не удалось сгенерировать пост. Проверьте логи.",
@@ -194,7 +197,7 @@ async def btn_post_today(message: Message) -> None:
             )
             
     except Exception as e:
-        logger.error(f"Error in btn_post_today: {e}", exc_info=True)
+        logger.error("Error in btn_post_today: %s", e, exc_info=True)
         await message.answer(
             "⚠️ Ошибка при генерации поста.",
             reply_markup=main_menu_keyboard()
@@ -206,31 +209,23 @@ async def btn_new_post(message: Message) -> None:
     """Handle 'Новый пост' button - start new post creation flow."""
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await send_access_denied(message)
         return
     
     try:
-        update_user_activity(
-            user_id=user_id,
-            first_name=message.from_user.first_name,
-            username=message.from_user.username,
-            action="btn_new_post"
-        )
-        
-        from keyboards import new_post_category_keyboard
+        _track(message, "btn_new_post")
         
         await message.answer(
-            "✨ <b>Новый пост</b>\n\n"
-            "Выберите тип поста:",
+            _NEW_POST_TEXT,
             parse_mode="HTML",
             reply_markup=new_post_category_keyboard()
         )
         
-        logger.info(f"{mask_user_id(user_id, config.debug_mode)} started new post flow")
+        logger.info("%s started new post flow", mask_user_id(user_id, _DEBUG_MODE))
         
     except Exception as e:
-        logger.error(f"Error in btn_new_post: {e}", exc_info=True)
+        logger.error("Error in btn_new_post: %s", e, exc_info=True)
         await message.answer(
             "⚠️ Ошибка. Попробуйте позже.",
             reply_markup=main_menu_keyboard()
@@ -242,24 +237,18 @@ async def btn_status(message: Message) -> None:
     """Handle 'Статус' button - show bot status."""
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await send_access_denied(message)
         return
     
     try:
-        update_user_activity(
-            user_id=user_id,
-            first_name=message.from_user.first_name,
-            username=message.from_user.username,
-            action="btn_status"
-        )
+        _track(message, "btn_status")
         
         # Reuse admin status command logic
-        from handlers.admin import cmd_status
         await cmd_status(message)
         
     except Exception as e:
-        logger.error(f"Error in btn_status: {e}", exc_info=True)
+        logger.error("Error in btn_status: %s", e, exc_info=True)
         await message.answer(
             "⚠️ Произошла ошибка при получении статуса.",
             reply_markup=main_menu_keyboard()
@@ -271,44 +260,32 @@ async def btn_settings(message: Message) -> None:
     """Handle 'Настройки' button - show settings menu."""
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await send_access_denied(message)
         return
     
     try:
-        update_user_activity(
-            user_id=user_id,
-            first_name=message.from_user.first_name,
-            username=message.from_user.username,
-            action="btn_settings"
-        )
-        
-        from services.settings_service import get_settings
+        _track(message, "btn_settings")
         
         settings = get_settings()
         img_status = "вкл" if settings.image_enabled else "выкл"
         model_name = settings.image_model
         template_name = settings.text_template
         
-        settings_text = f"""
-⚙️ <b>Настройки</b>
-
-<b>Текущие параметры:</b>
-🖼 Изображение: {img_status}
-🎨 Модель: {model_name}
-📝 Шаблон: {template_name}
-
-Выберите настройку для изменения:
-"""
+        settings_text = _SETTINGS_TEMPLATE.format_map({
+            "img_status": img_status,
+            "model_name": model_name,
+            "template_name": template_name,
+        })
         await message.answer(
             settings_text,
             parse_mode="HTML",
             reply_markup=settings_keyboard()
         )
-        logger.info(f"{mask_user_id(user_id, config.debug_mode)} opened settings")
+        logger.info("%s opened settings", mask_user_id(user_id, _DEBUG_MODE))
         
     except Exception as e:
-        logger.error(f"Error in btn_settings: {e}", exc_info=True)
+        logger.error("Error in btn_settings: %s", e, exc_info=True)
         await message.answer(
             "⚠️ Произошла ошибка.",
             reply_markup=main_menu_keyboard()
@@ -320,23 +297,18 @@ async def btn_help(message: Message) -> None:
     """Handle 'Помощь' button - show help."""
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await send_access_denied(message)
         return
     
     try:
-        update_user_activity(
-            user_id=user_id,
-            first_name=message.from_user.first_name,
-            username=message.from_user.username,
-            action="btn_help"
-        )
+        _track(message, "btn_help")
         
         await show_help(message)
-        logger.info(f"{mask_user_id(user_id, config.debug_mode)} requested help via button")
+        logger.info("%s requested help via button", mask_user_id(user_id, _DEBUG_MODE))
         
     except Exception as e:
-        logger.error(f"Error in btn_help: {e}", exc_info=True)
+        logger.error("Error in btn_help: %s", e, exc_info=True)
         await message.answer(
             "⚠️ Произошла ошибка.",
             reply_markup=main_menu_keyboard()
@@ -352,7 +324,7 @@ async def catch_all(message: Message) -> None:
     """Catch all other messages - check auth and show menu."""
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await send_access_denied(message)
         return
     
@@ -8,7 +8,7 @@ import re
 from typing import Optional
 
 from aiogram import Router, F
-from aiogram.types import Message, CallbackQuery
+from aiogram.types import Message, CallbackQuery, BufferedInputFile, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.fsm.context import FSMContext
 
 from config import config
@@ -20,6 +20,7 @@ from keyboards import (
     new_post_category_keyboard,
     recipe_category_keyboard,
     preview_post_keyboard,
+    recipe_confirm_keyboard,
     cancel_keyboard,
     skip_keyboard
 )
@@ -34,7 +35,14 @@ from handlers.states import (
     LifehackStates,
     is_menu_button
 )
-from services.user_service import update_user_activity
+from services.ai_content import generate_poll_post, generate_tip_post, generate_lifehack_post
+from services.image_generator import generate_image
+from services.post_service import (
+    get_pending_post,
+    post_to_channel,
+    send_preview_to_admin,
+    _pending_posts
+)
 from services.settings_service import get_settings, update_settings
 from utils.logger import mask_user_id
 
@@ -42,9 +50,11 @@ logger = logging.getLogger(__name__)
 router = Router(name="fsm")
 
 
-def is_admin(user_id: int) -> bool:
-    """Check if user is authorized admin."""
-    return config.is_admin(user_id)
+# Admin IDs frozenset, bound once for O(1) checks on the hot path
+_ADMINS = config.admin_user_ids
+
+# Debug mode is fixed at startup; bound once for the mask_user_id() log calls
+_DEBUG_MODE = config.debug_mode
 
 
 # ============================================
@@ -56,7 +66,7 @@ async def process_custom_time(message: Message, state: FSMContext) -> None:
     """Process custom time input from user."""
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await state.clear()
         return
     
@@ -124,7 +134,7 @@ async def process_custom_time(message: Message, state: FSMContext) -> None:
         reply_markup=main_menu_keyboard()
     )
     
-    logger.info(f"{mask_user_id(user_id, config.debug_mode)} set custom time: {formatted_time}")
+    logger.info("%s set custom time: %s", mask_user_id(user_id, _DEBUG_MODE), formatted_time)
 
 
 # ============================================
@@ -136,7 +146,7 @@ async def process_custom_length(message: Message, state: FSMContext) -> None:
     """Process custom post length input from user."""
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await state.clear()
         return
     
@@ -195,7 +205,7 @@ async def process_custom_length(message: Message, state: FSMContext) -> None:
         reply_markup=main_menu_keyboard()
     )
     
-    logger.info(f"{mask_user_id(user_id, config.debug_mode)} set custom length: {length}")
+    logger.info("%s set custom length: %s", mask_user_id(user_id, _DEBUG_MODE), length)
 
 
 # ============================================
@@ -207,7 +217,7 @@ async def process_custom_template(message: Message, state: FSMContext) -> None:
     """Process custom template text input from user."""
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await state.clear()
         return
     
@@ -237,7 +247,7 @@ async def process_custom_template(message: Message, state: FSMContext) -> None:
         reply_markup=main_menu_keyboard()
     )
     
-    logger.info(f"{mask_user_id(user_id, config.debug_mode)} set custom template")
+    logger.info("%s set custom template", mask_user_id(user_id, _DEBUG_MODE))
 
 
 # ============================================
@@ -249,7 +259,7 @@ async def process_content_photo(message: Message, state: FSMContext) -> None:
     """Process photo input for new post - handles photo with or without caption."""
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await state.clear()
         return
     
@@ -284,8 +294,6 @@ async def process_content_photo(message: Message, state: FSMContext) -> None:
         has_photo=True
     )
     
-    from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-    
     prompt_keyboard = InlineKeyboardMarkup(
         inline_keyboard=[
             [InlineKeyboardButton(text="✏️ Добавить текст", callback_data="newpost_prompt:custom")],
@@ -302,7 +310,7 @@ async def process_content_photo(message: Message, state: FSMContext) -> None:
     )
     
     await state.set_state(NewPostStates.waiting_for_prompt)
-    logger.info(f"{mask_user_id(user_id, config.debug_mode)} uploaded photo for new post")
+    logger.info("%s uploaded photo for new post", mask_user_id(user_id, _DEBUG_MODE))
 
 
 @router.message(NewPostStates.waiting_for_content, F.text)
@@ -310,7 +318,7 @@ async def process_content_text(message: Message, state: FSMContext) -> None:
     """Process text input for new post."""
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await state.clear()
         return
     
@@ -332,8 +340,6 @@ async def process_content_text(message: Message, state: FSMContext) -> None:
     )
     
     # Move to prompt choice
-    from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-    
     prompt_keyboard = InlineKeyboardMarkup(
         inline_keyboard=[
             [InlineKeyboardButton(text="✏️ Дать промпт", callback_data="newpost_prompt:custom")],
@@ -352,7 +358,7 @@ async def process_content_text(message: Message, state: FSMContext) -> None:
     )
     
     await state.set_state(NewPostStates.waiting_for_prompt)
-    logger.info(f"{mask_user_id(user_id, config.debug_mode)} provided idea for new post")
+    logger.info("%s provided idea for new post", mask_user_id(user_id, _DEBUG_MODE))
 
 
 @router.message(NewPostStates.waiting_for_prompt, F.text)
@@ -360,7 +366,7 @@ async def process_custom_prompt(message: Message, state: FSMContext) -> None:
     """Process custom prompt input."""
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await state.clear()
         return
     
@@ -398,7 +404,7 @@ async def process_edit_text(message: Message, state: FSMContext) -> None:
     """Process edited post text."""
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await state.clear()
         return
     
@@ -426,8 +432,6 @@ async def process_edit_text(message: Message, state: FSMContext) -> None:
         return
     
     # Update pending post
-    from services.post_service import get_pending_post, _pending_posts
-    
     post_data = get_pending_post(post_id)
     if not post_data:
         await state.clear()
@@ -444,8 +448,6 @@ async def process_edit_text(message: Message, state: FSMContext) -> None:
     await state.clear()
     
     # Show updated preview
-    from services.post_service import send_preview_to_admin
-    
     await send_preview_to_admin(
         bot=message.bot,
         admin_id=user_id,
@@ -458,7 +460,7 @@ async def process_edit_text(message: Message, state: FSMContext) -> None:
         reply_markup=main_menu_keyboard()
     )
     
-    logger.info(f"{mask_user_id(user_id, config.debug_mode)} edited post {post_id}")
+    logger.info("%s edited post %s", mask_user_id(user_id, _DEBUG_MODE), post_id)
 
 
 @router.message(EditPostStates.selecting_part, F.text)
@@ -466,7 +468,7 @@ async def process_select_part(message: Message, state: FSMContext) -> None:
     """Process part selection for multi-post editing."""
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await state.clear()
         return
     
@@ -507,7 +509,6 @@ async def process_select_part(message: Message, state: FSMContext) -> None:
     
     # Get current part text
     post_id = data.get("editing_post_id")
-    from services.post_service import get_pending_post
     post_data = get_pending_post(post_id)
     
     if post_data and "parts" in post_data:
@@ -543,8 +544,6 @@ async def generate_new_post(message: Message, state: FSMContext) -> None:
     await state.clear()
     
     try:
-        from services.post_service import post_to_channel
-        
         # Build combined prompt from user input
         combined_idea = user_idea
         if custom_prompt:
@@ -561,7 +560,7 @@ async def generate_new_post(message: Message, state: FSMContext) -> None:
         )
         
         if success and post_id:
-            logger.info(f"New post generated: {post_id}")
+            logger.info("New post generated: %s", post_id)
         else:
             await message.answer(
                 "❌ Не удалось сгенерировать пост. Попробуйте позже.",
@@ -569,7 +568,7 @@ async def generate_new_post(message: Message, state: FSMContext) -> None:
             )
             
     except Exception as e:
-        logger.error(f"Error generating new post: {e}", exc_info=True)
+        logger.error("Error generating new post: %s", e, exc_info=True)
         await message.answer(
             f"⚠️ Ошибка при генерации: {str(e)[:100]}",
             reply_markup=main_menu_keyboard()
@@ -602,7 +601,7 @@ async def process_poll_topic(message: Message, state: FSMContext) -> None:
     """Process poll topic input."""
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await state.clear()
         return
     
@@ -624,9 +623,6 @@ async def process_poll_topic(message: Message, state: FSMContext) -> None:
     )
     
     try:
-        from services.ai_content import generate_poll_post
-        from services.image_generator import generate_image
-        
         result = await generate_poll_post(topic)
         
         intro = result.get("intro_text", "")
@@ -640,10 +636,10 @@ async def process_poll_topic(message: Message, state: FSMContext) -> None:
             f"Варианты для опроса:\n" + "\n".join([f"• {opt}" for opt in options])
         )
         
-        logger.info(f"{mask_user_id(user_id, config.debug_mode)} generated poll")
+        logger.info("%s generated poll", mask_user_id(user_id, _DEBUG_MODE))
         
     except Exception as e:
-        logger.error(f"Error generating poll: {e}")
+        logger.error("Error generating poll: %s", e)
         await message.answer("❌ Ошибка генерации опроса.", reply_markup=main_menu_keyboard())
 
 
@@ -652,7 +648,7 @@ async def process_tip_topic(message: Message, state: FSMContext) -> None:
     """Process cooking tip topic input."""
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await state.clear()
         return
     
@@ -673,9 +669,6 @@ async def process_tip_topic(message: Message, state: FSMContext) -> None:
     )
     
     try:
-        from services.ai_content import generate_tip_post
-        from services.image_generator import generate_image
-        
         result = await generate_tip_post(topic)
         post_text = result.get("text", "💡 Совет дня")
         image_prompt = result.get("image_prompt", "cooking tip illustration")
@@ -684,16 +677,15 @@ async def process_tip_topic(message: Message, state: FSMContext) -> None:
         image_bytes = await generate_image(image_prompt)
         
         if image_bytes:
-            from aiogram.types import BufferedInputFile
             photo = BufferedInputFile(image_bytes, filename="tip.jpg")
             await message.answer_photo(photo=photo, caption=post_text, parse_mode="HTML")
         else:
             await message.answer(post_text, parse_mode="HTML")
         
-        logger.info(f"{mask_user_id(user_id, config.debug_mode)} generated tip")
+        logger.info("%s generated tip", mask_user_id(user_id, _DEBUG_MODE))
         
     except Exception as e:
-        logger.error(f"Error generating tip: {e}")
+        logger.error("Error generating tip: %s", e)
         await message.answer("❌ Ошибка генерации совета.", reply_markup=main_menu_keyboard())
 
 
@@ -702,7 +694,7 @@ async def process_lifehack_topic(message: Message, state: FSMContext) -> None:
     """Process kitchen lifehack topic input."""
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await state.clear()
         return
     
@@ -723,9 +715,6 @@ async def process_lifehack_topic(message: Message, state: FSMContext) -> None:
     )
     
     try:
-        from services.ai_content import generate_lifehack_post
-        from services.image_generator import generate_image
-        
         result = await generate_lifehack_post(topic)
         post_text = result.get("text", "🔧 Лайфхак")
         image_prompt = result.get("image_prompt", "kitchen lifehack illustration")
@@ -734,16 +723,15 @@ async def process_lifehack_topic(message: Message, state: FSMContext) -> None:
         image_bytes = await generate_image(image_prompt)
         
         if image_bytes:
-            from aiogram.types import BufferedInputFile
             photo = BufferedInputFile(image_bytes, filename="lifehack.jpg")
             await message.answer_photo(photo=photo, caption=post_text, parse_mode="HTML")
         else:
             await message.answer(post_text, parse_mode="HTML")
         
-        logger.info(f"{mask_user_id(user_id, config.debug_mode)} generated lifehack")
+        logger.info("%s generated lifehack", mask_user_id(user_id, _DEBUG_MODE))
         
     except Exception as e:
-        logger.error(f"Error generating lifehack: {e}")
+        logger.error("Error generating lifehack: %s", e)
         await message.answer("❌ Ошибка генерации лайфхака.", reply_markup=main_menu_keyboard())
 
 
@@ -756,7 +744,7 @@ async def process_recipe_idea(message: Message, state: FSMContext) -> None:
     """Process custom idea for recipe."""
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await state.clear()
         return
     
@@ -774,8 +762,6 @@ async def process_recipe_idea(message: Message, state: FSMContext) -> None:
     await state.update_data(recipe_idea=text)
     await state.set_state(RecipeStates.confirming)
     
-    from keyboards import recipe_confirm_keyboard
-    
     await message.answer(
         f"✅ <b>Идея сохранена!</b>\n\n"
         f"<i>«{text[:100]}{'...' if len(text) > 100 else ''}»</i>\n\n"
@@ -790,7 +776,7 @@ async def process_recipe_photo(message: Message, state: FSMContext) -> None:
     """Process custom photo for recipe."""
     user_id = message.from_user.id
     
-    if not is_admin(user_id):
+    if user_id not in _ADMINS:
         await state.clear()
         return
     
@@ -803,8 +789,6 @@ async def process_recipe_photo(message: Message, state: FSMContext) -> None:
     await state.update_data(recipe_photo_id=photo.file_id)
     await state.set_state(RecipeStates.confirming)
     
-    from keyboards import recipe_confirm_keyboard
-    
     await message.answer(
         "✅ <b>Фото сохранено!</b>\n\n"
         "Теперь можете сгенерировать рецепт:",
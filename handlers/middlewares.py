@@ -0,0 +1,67 @@
+"""
+Middlewares for the Utro Bot dispatcher.
+Cross-cutting concerns applied to every incoming update.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+logger = logging.getLogger(__name__)
+
+
+class ConcurrencyLimitMiddleware(BaseMiddleware):
+    """
+    Limit the number of updates processed at the same time.
+    
+    aiogram spawns a task per update, so a burst of updates would otherwise
+    run all handlers at once. Extra updates wait for a free slot instead.
+    """
+    
+    def __init__(self, limit: int = 16):
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit)
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        async with self._semaphore:
+            return await handler(event, data)
+
+
+class AdminOnlyMiddleware(BaseMiddleware):
+    """
+    Let only admin users through to the handlers of a router.
+    
+    Checks the event's user against a frozenset once per update, instead of
+    every handler repeating the check. Other users get `on_denied(event)`,
+    unless `exempt(event)` returns True for events anyone may reach.
+    """
+    
+    def __init__(
+        self,
+        admin_ids: FrozenSet[int],
+        on_denied: Callable[[TelegramObject], Awaitable[Any]],
+        exempt: Optional[Callable[[TelegramObject], bool]] = None
+    ):
+        self.admin_ids = admin_ids
+        self.on_denied = on_denied
+        self.exempt = exempt
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        user = data.get("event_from_user")
+        if user is None or user.id not in self.admin_ids:
+            if self.exempt is None or not self.exempt(event):
+                return await self.on_denied(event)
+        return await handler(event, data)
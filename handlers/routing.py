@@ -0,0 +1,107 @@
+"""
+Callback data routing for the Utro Bot.
+Resolves callback_data to a handler with one dict lookup instead of
+evaluating every registered F.data filter in turn.
+"""
+
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from aiogram import Router
+from aiogram.dispatcher.event.handler import CallableObject
+from aiogram.types import CallbackQuery
+
+logger = logging.getLogger(__name__)
+
+
+class CallbackRoutes:
+    """
+    Dispatch table for callback queries.
+
+    Exact callback_data values and "name:<arg>" prefixes are looked up in
+    dicts; any other prefixes are checked longest-first, so "set_time:"
+    and "set_time_" never shadow each other. The whole table is attached
+    to a router as one handler, and handler arguments (state, bot, ...) are
+    injected by aiogram as usual.
+    Prefix handlers may also declare `route_arg` to receive the rest of
+    callback_data after the prefix (e.g. the post ID in "publish:<id>").
+    An optional fallback handles unrouted callbacks in the same lookup, so
+    no separate catch-all handler has to be evaluated afterwards.
+    """
+
+    def __init__(self):
+        self._exact: Dict[str, CallableObject] = {}
+        self._field_prefixes: Dict[str, CallableObject] = {}
+        self._prefixes: List[Tuple[str, CallableObject]] = []
+        self._fallback: Optional[CallableObject] = None
+
+    def exact(self, *values: str) -> Callable:
+        """Register a handler for one or more exact callback_data values."""
+        def decorator(func: Callable) -> Callable:
+            handler = CallableObject(callback=func)
+            for value in values:
+                self._exact[value] = handler
+            return func
+        return decorator
+
+    def prefix(self, prefix: str) -> Callable:
+        """Register a handler for callback_data starting with prefix."""
+        def decorator(func: Callable) -> Callable:
+            handler = CallableObject(callback=func)
+            if prefix.endswith(":") and prefix.count(":") == 1:
+                # "name:" prefixes are keyed by the text before the first colon
+                self._field_prefixes[prefix] = handler
+            else:
+                self._prefixes.append((prefix, handler))
+                self._prefixes.sort(key=lambda item: len(item[0]), reverse=True)
+            return func
+        return decorator
+
+    def fallback(self, func: Callable) -> Callable:
+        """Register the handler for callback_data that matches no route."""
+        self._fallback = CallableObject(callback=func)
+        return func
+
+    def resolve(self, data: Optional[str]) -> Optional[Tuple[CallableObject, str]]:
+        """
+        Find the handler for callback_data.
+
+        Returns:
+            (handler, route_arg) tuple, or None if unrouted. route_arg is
+            the part of callback_data after the matched prefix ("" for exact).
+        """
+        if data is None:
+            return None
+        handler = self._exact.get(data)
+        if handler is not None:
+            return handler, ""
+        head, sep, rest = data.partition(":")
+        if sep:
+            handler = self._field_prefixes.get(head + sep)
+            if handler is not None:
+                return handler, rest
+        for prefix, handler in self._prefixes:
+            if data.startswith(prefix):
+                return handler, data[len(prefix):]
+        return None
+
+    def attach(self, router: Router) -> None:
+        """Register the table on router as a single callback_query handler."""
+
+        async def route_filter(callback: CallbackQuery) -> Union[bool, Dict[str, Any]]:
+            route = self.resolve(callback.data)
+            if route is None:
+                if self._fallback is None:
+                    return False
+                route = (self._fallback, "")
+            handler, arg = route
+            return {"route_handler": handler, "route_arg": arg}
+
+        async def dispatch(
+            callback: CallbackQuery,
+            route_handler: CallableObject,
+            **kwargs: Any
+        ) -> Any:
+            return await route_handler.call(callback, **kwargs)
+
+        router.callback_query.register(dispatch, route_filter)
@@ -4,6 +4,8 @@ Contains both Reply and Inline keyboards.
 Updated with new post flow, neural network tests submenu, improved navigation.
 """
 
+from functools import lru_cache
+
 from aiogram.types import (
     ReplyKeyboardMarkup, 
     KeyboardButton,
@@ -12,17 +14,19 @@ from aiogram.types import (
     ReplyKeyboardRemove
 )
 
-from services.settings_service import get_settings, TextTemplate, ImageModel
+from services.settings_service import get_settings, get_image_model_info, TextTemplate, ImageModel
 
 
 # ============================================
 # REPLY KEYBOARDS (Persistent Menu)
 # ============================================
 
+@lru_cache(maxsize=1)
 def main_menu_keyboard() -> ReplyKeyboardMarkup:
     """
     Create the main persistent menu keyboard.
     Always visible at the bottom of the chat.
+    Static, so it is built once and the same instance is reused.
     """
     keyboard = ReplyKeyboardMarkup(
         keyboard=[
@@ -44,24 +48,27 @@ def main_menu_keyboard() -> ReplyKeyboardMarkup:
     return keyboard
 
 
+@lru_cache(maxsize=1)
 def cancel_keyboard() -> ReplyKeyboardMarkup:
-    """Cancel button keyboard."""
+    """Cancel button keyboard (static, built once)."""
     return ReplyKeyboardMarkup(
         keyboard=[[KeyboardButton(text="❌ Отмена")]],
         resize_keyboard=True
     )
 
 
+@lru_cache(maxsize=1)
 def editing_keyboard() -> ReplyKeyboardMarkup:
-    """Keyboard for editing mode with cancel button."""
+    """Keyboard for editing mode with cancel button (static, built once)."""
     return ReplyKeyboardMarkup(
         keyboard=[[KeyboardButton(text="❌ Отмена редактирования")]],
         resize_keyboard=True
     )
 
 
+@lru_cache(maxsize=1)
 def skip_keyboard() -> ReplyKeyboardMarkup:
-    """Keyboard with skip and cancel buttons."""
+    """Keyboard with skip and cancel buttons (static, built once)."""
     return ReplyKeyboardMarkup(
         keyboard=[
             [KeyboardButton(text="⏭ Пропустить")],
@@ -86,17 +93,22 @@ def settings_keyboard() -> InlineKeyboardMarkup:
     Shows current settings values and options to change them.
     """
     settings = get_settings()
-    
+    return _settings_keyboard(settings.image_enabled, settings.image_model, settings.text_template)
+
+
+@lru_cache(maxsize=32)
+def _settings_keyboard(image_enabled: bool, image_model: str, text_template: str) -> InlineKeyboardMarkup:
+    """Build the settings keyboard for one combination of settings values."""
     # Format current values for display
-    img_status = "вкл" if settings.image_enabled else "выкл"
-    model_name = "DALL-E 3" if settings.image_model == ImageModel.DALLE3.value else "Flux"
+    img_status = "вкл" if image_enabled else "выкл"
+    model_name, _ = get_image_model_info(image_model)
     template_names = {
         TextTemplate.SHORT.value: "Короткий",
         TextTemplate.MEDIUM.value: "Средний",
         TextTemplate.LONG.value: "Длинный",
         TextTemplate.CUSTOM.value: "Свой"
     }
-    template_name = template_names.get(settings.text_template, "Средний")
+    template_name = template_names.get(text_template, "Средний")
     
     keyboard = InlineKeyboardMarkup(
         inline_keyboard=[
@@ -135,8 +147,9 @@ def settings_keyboard() -> InlineKeyboardMarkup:
     return keyboard
 
 
+@lru_cache(maxsize=1)
 def neural_tests_keyboard() -> InlineKeyboardMarkup:
-    """Keyboard for neural network tests submenu."""
+    """Keyboard for neural network tests submenu (static, built once)."""
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
@@ -154,8 +167,13 @@ def neural_tests_keyboard() -> InlineKeyboardMarkup:
 
 def confirm_image_test_keyboard() -> InlineKeyboardMarkup:
     """Confirmation dialog before generating test image."""
-    settings = get_settings()
-    model_name = "DALL-E 3" if settings.image_model == ImageModel.DALLE3.value else "Flux"
+    return _confirm_image_test_keyboard(get_settings().image_model)
+
+
+@lru_cache(maxsize=8)
+def _confirm_image_test_keyboard(image_model: str) -> InlineKeyboardMarkup:
+    """Build the test image confirmation keyboard for one image model."""
+    model_name, _ = get_image_model_info(image_model)
     
     return InlineKeyboardMarkup(
         inline_keyboard=[
@@ -174,10 +192,14 @@ def confirm_image_test_keyboard() -> InlineKeyboardMarkup:
 
 def model_select_keyboard() -> InlineKeyboardMarkup:
     """Keyboard for selecting image generation model."""
-    settings = get_settings()
-    
-    dalle_check = "✅ " if settings.image_model == ImageModel.DALLE3.value else ""
-    flux_check = "✅ " if settings.image_model == ImageModel.FLUX.value else ""
+    return _model_select_keyboard(get_settings().image_model)
+
+
+@lru_cache(maxsize=8)
+def _model_select_keyboard(image_model: str) -> InlineKeyboardMarkup:
+    """Build the model selection keyboard with image_model checked."""
+    dalle_check = "✅ " if image_model == ImageModel.DALLE3.value else ""
+    flux_check = "✅ " if image_model == ImageModel.FLUX.value else ""
     
     return InlineKeyboardMarkup(
         inline_keyboard=[
@@ -202,10 +224,14 @@ def model_select_keyboard() -> InlineKeyboardMarkup:
 
 def template_select_keyboard() -> InlineKeyboardMarkup:
     """Keyboard for selecting text template."""
-    settings = get_settings()
-    
+    return _template_select_keyboard(get_settings().text_template)
+
+
+@lru_cache(maxsize=8)
+def _template_select_keyboard(text_template: str) -> InlineKeyboardMarkup:
+    """Build the template selection keyboard with text_template checked."""
     def check(t): 
-        return "✅ " if settings.text_template == t else ""
+        return "✅ " if text_template == t else ""
     
     return InlineKeyboardMarkup(
         inline_keyboard=[
@@ -246,8 +272,9 @@ def template_select_keyboard() -> InlineKeyboardMarkup:
     )
 
 
+@lru_cache(maxsize=1)
 def new_post_category_keyboard() -> InlineKeyboardMarkup:
-    """Keyboard for selecting new post category."""
+    """Keyboard for selecting new post category (static, built once)."""
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
@@ -270,8 +297,9 @@ def new_post_category_keyboard() -> InlineKeyboardMarkup:
     )
 
 
+@lru_cache(maxsize=1)
 def recipe_category_keyboard() -> InlineKeyboardMarkup:
-    """Keyboard for selecting recipe category."""
+    """Keyboard for selecting recipe category (static, built once)."""
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
@@ -297,8 +325,12 @@ def recipe_category_keyboard() -> InlineKeyboardMarkup:
     )
 
 
+@lru_cache(maxsize=16)
 def recipe_confirm_keyboard(category: str) -> InlineKeyboardMarkup:
-    """Keyboard for recipe confirmation with options to add custom idea/photo."""
+    """
+    Keyboard for recipe confirmation with options to add custom idea/photo.
+    Built once per category (there are only a handful).
+    """
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
@@ -317,8 +349,9 @@ def recipe_confirm_keyboard(category: str) -> InlineKeyboardMarkup:
     )
 
 
+@lru_cache(maxsize=1)
 def back_keyboard() -> InlineKeyboardMarkup:
-    """Create a simple back button keyboard."""
+    """Create a simple back button keyboard (static, built once)."""
     keyboard = InlineKeyboardMarkup(
         inline_keyboard=[
             [
@@ -329,8 +362,9 @@ def back_keyboard() -> InlineKeyboardMarkup:
     return keyboard
 
 
+@lru_cache(maxsize=1)
 def confirm_post_keyboard() -> InlineKeyboardMarkup:
-    """Create confirmation keyboard for posting."""
+    """Create confirmation keyboard for posting (static, built once)."""
     keyboard = InlineKeyboardMarkup(
         inline_keyboard=[
             [
@@ -380,8 +414,9 @@ def preview_post_keyboard(post_id: str = "") -> InlineKeyboardMarkup:
     return keyboard
 
 
+@lru_cache(maxsize=1)
 def schedule_keyboard() -> InlineKeyboardMarkup:
-    """Create schedule settings keyboard."""
+    """Create schedule settings keyboard (static, built once)."""
     keyboard = InlineKeyboardMarkup(
         inline_keyboard=[
             [
@@ -403,8 +438,9 @@ def schedule_keyboard() -> InlineKeyboardMarkup:
     return keyboard
 
 
+@lru_cache(maxsize=1)
 def test_result_keyboard() -> InlineKeyboardMarkup:
-    """Create keyboard for test results with back button."""
+    """Create keyboard for test results with back button (static, built once)."""
     keyboard = InlineKeyboardMarkup(
         inline_keyboard=[
             [
@@ -459,8 +495,9 @@ def multipost_keyboard(post_id: str, part_num: int, total_parts: int) -> InlineK
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+@lru_cache(maxsize=1)
 def photo_prompt_keyboard() -> InlineKeyboardMarkup:
-    """Keyboard for asking about photo attachment."""
+    """Keyboard for asking about photo attachment (static, built once)."""
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
@@ -473,8 +510,9 @@ def photo_prompt_keyboard() -> InlineKeyboardMarkup:
     )
 
 
+@lru_cache(maxsize=1)
 def post_prompt_keyboard() -> InlineKeyboardMarkup:
-    """Keyboard for asking about post content."""
+    """Keyboard for asking about post content (static, built once)."""
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
@@ -491,8 +529,9 @@ def post_prompt_keyboard() -> InlineKeyboardMarkup:
 # LEGACY KEYBOARDS (kept for compatibility)
 # ============================================
 
+@lru_cache(maxsize=1)
 def get_admin_keyboard() -> InlineKeyboardMarkup:
-    """Create admin control keyboard (legacy)."""
+    """Create admin control keyboard (legacy, static, built once)."""
     keyboard = InlineKeyboardMarkup(
         inline_keyboard=[
             [
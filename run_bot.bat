@@ -1,6 +1,6 @@
 @echo off
 echo ========================================
-echo Starting Utro Bot v2
+echo Starting Utro Bot
 echo ========================================
 
 REM Check if virtual environment exists
@@ -13,6 +13,6 @@ if exist "venv\Scripts\activate.bat" (
 
 REM Run the bot
 echo Starting bot...
-python bot_v2.py
+python bot.py
 
 pause
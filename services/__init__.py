@@ -1,29 +1,33 @@
 """
 Services package for the Utro Bot.
 Contains business logic for posting, API integrations, scheduling, and user management.
+
+Exports are resolved lazily (PEP 562) so importing one service does not
+load the OpenAI/APScheduler stacks of all the others.
 """
 
-from .scheduler import start_scheduler, stop_scheduler
-from .holidays_api import fetch_holidays_for_date
-from .ai_content import generate_post_content
-from .image_generator import generate_food_image
-from .post_service import post_to_channel
-from .user_service import (
-    update_user_activity,
-    load_user_data,
-    save_user_data,
-    ensure_data_file_exists
-)
+import importlib
+
+_EXPORTS = {
+    "start_scheduler": ".scheduler",
+    "stop_scheduler": ".scheduler",
+    "fetch_holidays_for_date": ".holidays_api",
+    "generate_post_content": ".ai_content",
+    "generate_food_image": ".image_generator",
+    "post_to_channel": ".post_service",
+    "update_user_activity": ".user_service",
+    "load_user_data": ".user_service",
+    "save_user_data": ".user_service",
+    "ensure_data_file_exists": ".user_service",
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = [
-    "start_scheduler",
-    "stop_scheduler",
-    "fetch_holidays_for_date",
-    "generate_post_content",
-    "generate_food_image",
-    "post_to_channel",
-    "update_user_activity",
-    "load_user_data",
-    "save_user_data",
-    "ensure_data_file_exists"
-]
+def __getattr__(name: str):
+    """Import the exporting submodule on first access."""
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -28,6 +28,14 @@ def get_openai_client() -> AsyncOpenAI:
     return openai_client
 
 
+async def close_openai_client() -> None:
+    """Close the OpenAI client and release its pooled connections."""
+    global openai_client
+    if openai_client is not None:
+        await openai_client.close()
+        openai_client = None
+
+
 # Day names in Russian
 WEEKDAYS_RU = {
     0: "понедельник",
@@ -322,8 +330,8 @@ def _get_static_fallback(target_date: date, quote: Dict) -> Dict[str, Any]:
     }
 
 
-async def generate_greeting() -> str:
-    """Generate a unique morning greeting."""
+async def generate_greeting(fallback: bool = True) -> str:
+    """Generate a unique morning greeting (fallback=False re-raises API errors)."""
     client = get_openai_client()
     
     try:
@@ -339,6 +347,8 @@ async def generate_greeting() -> str:
         return response.choices[0].message.content.strip()
     except Exception as e:
         logger.error(f"Error generating greeting: {e}")
+        if not fallback:
+            raise
         return "Доброе утро, мои дорогие! ☀️ Пусть этот день будет наполнен вкусной и полезной едой!"
 
 
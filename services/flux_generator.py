@@ -10,6 +10,7 @@ import base64
 from typing import Optional
 
 from config import config
+from services.http_session import get_http_session
 from services.settings_service import get_settings
 
 logger = logging.getLogger(__name__)
@@ -66,33 +67,34 @@ async def generate_flux_image(
             logger.info(f"Generating Flux image for '{recipe_name}' (attempt {attempt}/{max_retries})")
             
             timeout = aiohttp.ClientTimeout(total=120)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(
-                    settings.flux_api_url,
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        # Extract base64 image
-                        if "data" in data and len(data["data"]) > 0:
-                            b64_image = data["data"][0].get("b64_json")
-                            if b64_image:
-                                image_bytes = base64.b64decode(b64_image)
-                                logger.info(f"Flux image generated successfully ({len(image_bytes)} bytes)")
-                                return image_bytes
-                        
-                        logger.warning(f"Unexpected Flux response format: {data}")
-                        
-                    elif response.status == 429:
-                        logger.warning("Flux rate limit hit, waiting...")
-                        await asyncio.sleep(5 * attempt)
-                        
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Flux API error {response.status}: {error_text}")
-                        
+            session = get_http_session()
+            async with session.post(
+                settings.flux_api_url,
+                headers=headers,
+                json=payload,
+                timeout=timeout
+            ) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    
+                    # Extract base64 image
+                    if "data" in data and len(data["data"]) > 0:
+                        b64_image = data["data"][0].get("b64_json")
+                        if b64_image:
+                            image_bytes = base64.b64decode(b64_image)
+                            logger.info(f"Flux image generated successfully ({len(image_bytes)} bytes)")
+                            return image_bytes
+                    
+                    logger.warning("Unexpected Flux response format: %s", data)
+                    
+                elif response.status == 429:
+                    logger.warning("Flux rate limit hit, waiting...")
+                    await asyncio.sleep(5 * attempt)
+                    
+                else:
+                    error_text = await response.text()
+                    logger.error(f"Flux API error {response.status}: {error_text}")
+                    
         except asyncio.TimeoutError:
             logger.error(f"Flux image generation timeout (attempt {attempt})")
         except aiohttp.ClientError as e:
@@ -160,26 +162,27 @@ async def generate_flux_pro_image(
             logger.info(f"Generating Flux Pro image for '{recipe_name}' (attempt {attempt}/{max_retries})")
             
             timeout = aiohttp.ClientTimeout(total=180)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(
-                    settings.flux_api_url,
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        if "data" in data and len(data["data"]) > 0:
-                            b64_image = data["data"][0].get("b64_json")
-                            if b64_image:
-                                image_bytes = base64.b64decode(b64_image)
-                                logger.info(f"Flux Pro image generated ({len(image_bytes)} bytes)")
-                                return image_bytes
-                        
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Flux Pro API error {response.status}: {error_text}")
-                        
+            session = get_http_session()
+            async with session.post(
+                settings.flux_api_url,
+                headers=headers,
+                json=payload,
+                timeout=timeout
+            ) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    
+                    if "data" in data and len(data["data"]) > 0:
+                        b64_image = data["data"][0].get("b64_json")
+                        if b64_image:
+                            image_bytes = base64.b64decode(b64_image)
+                            logger.info(f"Flux Pro image generated ({len(image_bytes)} bytes)")
+                            return image_bytes
+                    
+                else:
+                    error_text = await response.text()
+                    logger.error(f"Flux Pro API error {response.status}: {error_text}")
+                    
         except Exception as e:
             logger.error(f"Flux Pro generation error: {e}", exc_info=True)
         
@@ -4,19 +4,29 @@ Fetches real holidays from Calendarific API.
 """
 
 import logging
+import time
 import aiohttp
 import asyncio
 from datetime import date
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from functools import lru_cache
 
 from config import config
 from services.api_safety import get_rate_limiter
+from services.http_session import get_http_session
 
 logger = logging.getLogger(__name__)
 
-# In-memory cache for daily holidays
-_holidays_cache: Dict[str, List[Dict]] = {}
+# In-memory cache for daily holidays: cache_key -> (monotonic timestamp, holidays)
+_holidays_cache: Dict[str, Tuple[float, List[Dict]]] = {}
+
+# Holidays for a date don't change, so non-empty results are kept until the
+# date rolls over (entries are keyed by date and older dates are dropped).
+# Empty results usually mean an API error or missing key - retry sooner
+HOLIDAYS_EMPTY_CACHE_TTL = 10 * 60
+
+# In-flight fetches, so concurrent callers for the same date share one request
+_inflight: Dict[str, asyncio.Task] = {}
 
 # Food-related keywords to filter holidays
 FOOD_KEYWORDS = [
@@ -77,33 +87,33 @@ async def _fetch_from_calendarific(
     
     try:
         timeout = aiohttp.ClientTimeout(total=10)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.get(url, params=params) as response:
-                if response.status != 200:
-                    logger.error(f"Calendarific API error: {response.status}")
-                    return []
-                
-                data = await response.json()
-                
-                if data.get("meta", {}).get("code") != 200:
-                    logger.error(f"Calendarific API returned error: {data}")
-                    return []
-                
-                holidays_raw = data.get("response", {}).get("holidays", [])
-                
-                holidays = []
-                for h in holidays_raw:
-                    holidays.append({
-                        "name": h.get("name", ""),
-                        "description": h.get("description", ""),
-                        "type": ", ".join(h.get("type", ["observance"])),
-                        "country": country,
-                        "primary_type": h.get("primary_type", "observance")
-                    })
-                
-                logger.info(f"Fetched {len(holidays)} holidays from Calendarific for {country}")
-                return holidays
-                
+        session = get_http_session()
+        async with session.get(url, params=params, timeout=timeout) as response:
+            if response.status != 200:
+                logger.error(f"Calendarific API error: {response.status}")
+                return []
+            
+            data = await response.json()
+            
+            if data.get("meta", {}).get("code") != 200:
+                logger.error(f"Calendarific API returned error: {data}")
+                return []
+            
+            holidays_raw = data.get("response", {}).get("holidays", [])
+            
+            holidays = []
+            for h in holidays_raw:
+                holidays.append({
+                    "name": h.get("name", ""),
+                    "description": h.get("description", ""),
+                    "type": ", ".join(h.get("type", ["observance"])),
+                    "country": country,
+                    "primary_type": h.get("primary_type", "observance")
+                })
+            
+            logger.info(f"Fetched {len(holidays)} holidays from Calendarific for {country}")
+            return holidays
+            
     except asyncio.TimeoutError:
         logger.error("Calendarific API timeout")
         return []
@@ -115,12 +125,37 @@ async def _fetch_from_calendarific(
         return []
 
 
+def get_cached_holidays(target_date: date) -> Optional[List[Dict]]:
+    """
+    Get holidays for a date from the in-memory cache without fetching.
+    
+    Args:
+        target_date: Date to look up
+    
+    Returns:
+        Cached holiday list, or None if missing/expired or caching is disabled
+    """
+    if not config.holidays_caching_enabled:
+        return None
+    
+    cached = _holidays_cache.get(_get_cache_key(target_date))
+    if cached is None:
+        return None
+    
+    cached_at, holidays = cached
+    if not holidays and time.monotonic() - cached_at >= HOLIDAYS_EMPTY_CACHE_TTL:
+        return None
+    return holidays
+
+
 async def fetch_holidays_for_date(target_date: date) -> List[Dict]:
     """
     Fetch holidays for a specific date with caching.
     
     Combines Russian holidays and international food-related holidays.
-    Uses in-memory cache to avoid repeated API calls.
+    Uses in-memory TTL cache to avoid repeated API calls, and joins
+    concurrent callers onto one in-flight request.
+    Set HOLIDAYS_CACHING_ENABLED=0 to always hit the API (debugging).
     
     Args:
         target_date: Date to fetch holidays for
@@ -128,13 +163,31 @@ async def fetch_holidays_for_date(target_date: date) -> List[Dict]:
     Returns:
         List of holiday dictionaries with name, description, type
     """
+    if not config.holidays_caching_enabled:
+        return await _load_holidays(target_date)
+    
     cache_key = _get_cache_key(target_date)
     
     # Check cache first
-    if cache_key in _holidays_cache:
+    cached = get_cached_holidays(target_date)
+    if cached is not None:
         logger.debug(f"Returning cached holidays for {target_date}")
-        return _holidays_cache[cache_key]
+        return cached
+    
+    # Join an in-flight request for the same date, or start one
+    task = _inflight.get(cache_key)
+    if task is None:
+        task = asyncio.create_task(_load_holidays(target_date))
+        _inflight[cache_key] = task
+        task.add_done_callback(lambda _: _inflight.pop(cache_key, None))
     
+    # Shield so one cancelled caller doesn't cancel the shared request
+    return await asyncio.shield(task)
+
+
+async def _load_holidays(target_date: date) -> List[Dict]:
+    """Fetch, merge and cache holidays for a date (uncached path)."""
+    cache_key = _get_cache_key(target_date)
     all_holidays = []
     
     try:
@@ -166,12 +219,13 @@ async def fetch_holidays_for_date(target_date: date) -> List[Dict]:
         unique_holidays.sort(key=lambda x: (not _is_food_related(x), x["name"]))
         
         # Cache the results
-        _holidays_cache[cache_key] = unique_holidays
-        
-        # Clean old cache entries (keep only today)
-        keys_to_remove = [k for k in _holidays_cache if k != cache_key]
-        for k in keys_to_remove:
-            del _holidays_cache[k]
+        if config.holidays_caching_enabled:
+            _holidays_cache[cache_key] = (time.monotonic(), unique_holidays)
+            
+            # Clean old cache entries (keep only today)
+            keys_to_remove = [k for k in _holidays_cache if k != cache_key]
+            for k in keys_to_remove:
+                del _holidays_cache[k]
         
         logger.info(f"Total holidays for {target_date}: {len(unique_holidays)}")
         return unique_holidays
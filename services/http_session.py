@@ -0,0 +1,38 @@
+"""
+Shared HTTP session for outbound API calls.
+Keeps one pooled aiohttp session so Calendarific, Flux and image downloads
+reuse warm TCP/TLS connections instead of handshaking on every request.
+"""
+
+import logging
+from typing import Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Global session instance (created lazily inside the running event loop)
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Get or create the shared aiohttp session."""
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=20,
+            keepalive_timeout=75,
+            ttl_dns_cache=300
+        )
+        _session = aiohttp.ClientSession(connector=connector)
+    return _session
+
+
+async def close_http_session() -> None:
+    """Close the shared aiohttp session and release pooled connections."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+        logger.info("HTTP session closed")
+    _session = None
@@ -13,6 +13,7 @@ from openai import AsyncOpenAI
 
 from config import config
 from services.api_safety import get_rate_limiter
+from services.http_session import get_http_session
 from services.settings_service import get_settings, ImageModel
 
 logger = logging.getLogger(__name__)
@@ -29,6 +30,14 @@ def get_openai_client() -> AsyncOpenAI:
     return openai_client
 
 
+async def close_openai_client() -> None:
+    """Close the OpenAI client and release its pooled connections."""
+    global openai_client
+    if openai_client is not None:
+        await openai_client.close()
+        openai_client = None
+
+
 async def generate_image(
     prompt: str,
     max_retries: int = 3
@@ -47,18 +56,15 @@ async def generate_image(
     
     # Check which model is selected
     if settings.image_model == ImageModel.DALLE3.value:
-        logger.info(f"Using DALL-E 3 for image generation")
+        logger.info("Using DALL-E 3 for image generation")
         return await generate_dalle_image(prompt, max_retries)
     else:
-        logger.info(f"Using Flux for image generation")
+        logger.info("Using Flux for image generation")
         return await generate_flux_image(prompt, max_retries)
 
 
-async def generate_dalle_image(
-    prompt: str,
-    max_retries: int = 3
-) -> Optional[bytes]:
-    """Generate image using DALL-E 3."""
+async def _create_dalle_url(prompt: str) -> str:
+    """Run one rate-limited DALL-E 3 request and return the image URL."""
     client = get_openai_client()
     
     # Enhance prompt for better food photography
@@ -70,40 +76,81 @@ async def generate_dalle_image(
         "warm and inviting atmosphere, no text or watermarks"
     )
     
+    await get_rate_limiter("dalle").check_rate_limit()
+    
+    response = await client.images.generate(
+        model="dall-e-3",
+        prompt=enhanced_prompt,
+        size="1024x1024",
+        quality="standard",
+        n=1
+    )
+    return response.data[0].url
+
+
+async def generate_dalle_image(
+    prompt: str,
+    max_retries: int = 3
+) -> Optional[bytes]:
+    """Generate image using DALL-E 3."""
     for attempt in range(1, max_retries + 1):
         try:
-            await get_rate_limiter("dalle").check_rate_limit()
-            
-            logger.info(f"Generating DALL-E image (attempt {attempt}/{max_retries})")
+            logger.info("Generating DALL-E image (attempt %d/%d)", attempt, max_retries)
             
-            response = await client.images.generate(
-                model="dall-e-3",
-                prompt=enhanced_prompt,
-                size="1024x1024",
-                quality="standard",
-                n=1
-            )
-            
-            image_url = response.data[0].url
-            logger.info(f"DALL-E image generated, downloading...")
+            image_url = await _create_dalle_url(prompt)
+            logger.info("DALL-E image generated, downloading...")
             
             image_bytes = await _download_image(image_url)
             
             if image_bytes:
-                logger.info(f"DALL-E image downloaded ({len(image_bytes)} bytes)")
+                logger.info("DALL-E image downloaded (%d bytes)", len(image_bytes))
                 return image_bytes
             else:
-                logger.warning(f"Failed to download DALL-E image on attempt {attempt}")
+                logger.warning("Failed to download DALL-E image on attempt %d", attempt)
                 
         except Exception as e:
-            logger.error(f"DALL-E error (attempt {attempt}): {e}", exc_info=True)
+            logger.error("DALL-E error (attempt %d): %s", attempt, e, exc_info=True)
+            
+            if attempt < max_retries:
+                wait_time = 2 ** attempt
+                logger.info("Waiting %ds before retry...", wait_time)
+                await asyncio.sleep(wait_time)
+    
+    logger.error("DALL-E failed after %d attempts", max_retries)
+    return None
+
+
+async def generate_dalle_image_url(
+    prompt: str,
+    max_retries: int = 3
+) -> Optional[str]:
+    """
+    Generate image using DALL-E 3 without downloading it.
+    
+    The returned URL can be passed to Telegram as URLInputFile, so the
+    image is streamed through in chunks instead of buffered in memory.
+    
+    Args:
+        prompt: Description of the image to generate
+        max_retries: Maximum number of retry attempts
+    
+    Returns:
+        Temporary image URL or None if generation fails
+    """
+    for attempt in range(1, max_retries + 1):
+        try:
+            logger.info("Generating DALL-E image URL (attempt %d/%d)", attempt, max_retries)
+            return await _create_dalle_url(prompt)
+        
+        except Exception as e:
+            logger.error("DALL-E error (attempt %d): %s", attempt, e, exc_info=True)
             
             if attempt < max_retries:
                 wait_time = 2 ** attempt
-                logger.info(f"Waiting {wait_time}s before retry...")
+                logger.info("Waiting %ds before retry...", wait_time)
                 await asyncio.sleep(wait_time)
     
-    logger.error(f"DALL-E failed after {max_retries} attempts")
+    logger.error("DALL-E failed after %d attempts", max_retries)
     return None
 
 
@@ -127,7 +174,7 @@ async def generate_flux_image(
         try:
             await get_rate_limiter("flux").check_rate_limit()
             
-            logger.info(f"Generating Flux image (attempt {attempt}/{max_retries})")
+            logger.info("Generating Flux image (attempt %d/%d)", attempt, max_retries)
             
             headers = {
                 "Authorization": f"Bearer {settings.flux_api_key}",
@@ -145,33 +192,34 @@ async def generate_flux_image(
             }
             
             timeout = aiohttp.ClientTimeout(total=60)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(
-                    settings.flux_api_url,
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get("data") and len(data["data"]) > 0:
-                            import base64
-                            b64_image = data["data"][0].get("b64_json")
-                            if b64_image:
-                                image_bytes = base64.b64decode(b64_image)
-                                logger.info(f"Flux image generated ({len(image_bytes)} bytes)")
-                                return image_bytes
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Flux API error {response.status}: {error_text}")
-                        
+            session = get_http_session()
+            async with session.post(
+                settings.flux_api_url,
+                headers=headers,
+                json=payload,
+                timeout=timeout
+            ) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    if data.get("data") and len(data["data"]) > 0:
+                        import base64
+                        b64_image = data["data"][0].get("b64_json")
+                        if b64_image:
+                            image_bytes = base64.b64decode(b64_image)
+                            logger.info("Flux image generated (%d bytes)", len(image_bytes))
+                            return image_bytes
+                else:
+                    error_text = await response.text()
+                    logger.error("Flux API error %d: %s", response.status, error_text)
+                    
         except Exception as e:
-            logger.error(f"Flux error (attempt {attempt}): {e}", exc_info=True)
+            logger.error("Flux error (attempt %d): %s", attempt, e, exc_info=True)
             
             if attempt < max_retries:
                 wait_time = 2 ** attempt
                 await asyncio.sleep(wait_time)
     
-    logger.error(f"Flux failed after {max_retries} attempts")
+    logger.error("Flux failed after %d attempts", max_retries)
     return None
 
 
@@ -191,7 +239,7 @@ async def generate_food_image(
     Returns:
         Image bytes or None if generation fails
     """
-    logger.info(f"Generating image for recipe: {recipe_name}")
+    logger.info("Generating image for recipe: %s", recipe_name)
     return await generate_image(english_prompt, max_retries)
 
 
@@ -211,22 +259,22 @@ async def _download_image(
     """
     try:
         client_timeout = aiohttp.ClientTimeout(total=timeout)
-        async with aiohttp.ClientSession(timeout=client_timeout) as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.read()
-                else:
-                    logger.error(f"Image download failed with status {response.status}")
-                    return None
+        session = get_http_session()
+        async with session.get(url, timeout=client_timeout) as response:
+            if response.status == 200:
+                return await response.read()
+            else:
+                logger.error("Image download failed with status %d", response.status)
+                return None
                     
     except asyncio.TimeoutError:
         logger.error("Image download timeout")
         return None
     except aiohttp.ClientError as e:
-        logger.error(f"Image download error: {e}")
+        logger.error("Image download error: %s", e)
         return None
     except Exception as e:
-        logger.error(f"Unexpected error downloading image: {e}", exc_info=True)
+        logger.error("Unexpected error downloading image: %s", e, exc_info=True)
         return None
 
 
@@ -246,7 +294,7 @@ async def generate_simple_food_image(dish_description: str) -> Optional[bytes]:
     simple_prompt = f"Appetizing {dish_description}, food photography, white background"
     
     try:
-        logger.info(f"Generating simple image for: {dish_description}")
+        logger.info("Generating simple image for: %s", dish_description)
         
         response = await client.images.generate(
             model="dall-e-3",
@@ -260,5 +308,5 @@ async def generate_simple_food_image(dish_description: str) -> Optional[bytes]:
         return await _download_image(image_url)
         
     except Exception as e:
-        logger.error(f"Simple image generation failed: {e}")
+        logger.error("Simple image generation failed: %s", e)
         return None
@@ -7,6 +7,7 @@ import asyncio
 import json
 import logging
 import random
+import re
 import uuid
 from datetime import date, datetime
 from io import BytesIO
@@ -17,9 +18,16 @@ from aiogram import Bot
 from aiogram.types import BufferedInputFile, InlineKeyboardMarkup
 
 from config import config
+from keyboards import preview_post_keyboard
 from services.ai_content import MONTHS_RU, WEEKDAYS_RU, generate_post_content
 from services.holidays_api import fetch_holidays_for_date
 from services.image_generator import generate_food_image
+from services.settings_service import (
+    TextTemplate,
+    get_channel_signature,
+    get_settings,
+    get_template_limit,
+)
 from utils.logger import mask_channel_id, mask_user_id
 
 logger = logging.getLogger(__name__)
@@ -30,6 +38,10 @@ QUOTES_FILE = Path(__file__).parent.parent / "data" / "quotes.json"
 # Temporary storage for preview posts (post_id -> post_data)
 _pending_posts: Dict[str, Dict[str, Any]] = {}
 
+# Channel publishing runs one pipeline at a time (shared OpenAI quota and
+# channel order); shared by the inline buttons and /post_now
+channel_post_sem = asyncio.Semaphore(1)
+
 # Multi-post configuration
 MULTIPOST_THRESHOLD = 4096  # Characters threshold for splitting (Telegram's max)
 MULTIPOST_TARGET_LENGTH = 3500  # Target length per part
@@ -150,8 +162,6 @@ def split_post_into_parts(
 
 def split_by_sentences(text: str) -> list[str]:
     """Split text into sentences."""
-    import re
-
     # Split on . ! ? followed by space or end
     sentences = re.split(r"(?<=[.!?])\s+", text)
     return [s for s in sentences if s.strip()]
@@ -175,13 +185,6 @@ def format_post_text(
     Returns:
         Formatted HTML post text
     """
-    from services.settings_service import (
-        TextTemplate,
-        get_channel_signature,
-        get_settings,
-        get_template_limit,
-    )
-
     settings = get_settings()
     max_length = get_template_limit()
 
@@ -631,9 +634,6 @@ async def post_to_channel(
     if preview_mode and admin_id:
         post_id = store_pending_post(post_data)
 
-        # Import here to avoid circular imports
-        from keyboards import preview_post_keyboard
-
         kb = reply_markup or preview_post_keyboard(post_id)
 
         success = await send_preview_to_admin(bot, admin_id, post_data, kb)
@@ -19,13 +19,22 @@ logger = logging.getLogger(__name__)
 # Global scheduler instance
 scheduler: Optional[AsyncIOScheduler] = None
 
+# Scheduler timezone, resolved once at import
+TZ = pytz.timezone(config.timezone)
+
+# Coalesce missed runs and never run two posts at once (each one calls paid APIs)
+JOB_DEFAULTS = {
+    "coalesce": True,
+    "max_instances": 1,
+    "misfire_grace_time": 3600,  # Allow 1 hour grace time for missed jobs
+}
+
 
 def get_scheduler() -> AsyncIOScheduler:
     """Get or create scheduler instance."""
     global scheduler
     if scheduler is None:
-        timezone = pytz.timezone(config.timezone)
-        scheduler = AsyncIOScheduler(timezone=timezone)
+        scheduler = AsyncIOScheduler(timezone=TZ, job_defaults=JOB_DEFAULTS)
     return scheduler
 
 
@@ -65,7 +74,7 @@ def start_scheduler(
     trigger = CronTrigger(
         hour=hour,
         minute=minute,
-        timezone=pytz.timezone(config.timezone)
+        timezone=TZ
     )
     
     # Add the morning post job
@@ -74,8 +83,7 @@ def start_scheduler(
         trigger=trigger,
         id="morning_post",
         name="Daily Morning Post",
-        replace_existing=True,
-        misfire_grace_time=3600  # Allow 1 hour grace time for missed jobs
+        replace_existing=True
     )
     
     # Start the scheduler
@@ -121,7 +129,7 @@ def trigger_job_now() -> bool:
     sched = get_scheduler()
     job = sched.get_job("morning_post")
     if job:
-        sched.modify_job("morning_post", next_run_time=datetime.now(pytz.timezone(config.timezone)))
+        sched.modify_job("morning_post", next_run_time=datetime.now(TZ))
         logger.info("Morning post job triggered manually")
         return True
     return False
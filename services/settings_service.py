@@ -8,7 +8,7 @@ import logging
 from dataclasses import asdict, dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +32,18 @@ class ImageModel(str, Enum):
     FLUX = "flux"  # Flux model
 
 
+# Display name and approximate cost per image for each model
+IMAGE_MODEL_INFO: Dict[str, Tuple[str, str]] = {
+    ImageModel.DALLE3.value: ("DALL-E 3", "~$0.04"),
+    ImageModel.FLUX.value: ("Flux", "~$0.003"),
+}
+
+
+def get_image_model_info(model: str) -> Tuple[str, str]:
+    """Get (display name, cost) for an image model value (unknown values show as Flux)."""
+    return IMAGE_MODEL_INFO.get(model, IMAGE_MODEL_INFO[ImageModel.FLUX.value])
+
+
 class RecipeType(str, Enum):
     """Recipe type options."""
 
@@ -135,18 +147,24 @@ def save_settings() -> bool:
 
 def get_settings() -> BotSettings:
     """Get current settings (loads if not loaded)."""
+    # Hot path: settings are read on every keyboard render and post
+    if _settings is not None:
+        return _settings
     return load_settings()
 
 
 def update_settings(**kwargs) -> BotSettings:
-    """Update specific settings and save."""
+    """Update specific settings and save (skips the file write if nothing changed)."""
     settings = get_settings()
 
+    changed = False
     for key, value in kwargs.items():
-        if hasattr(settings, key):
+        if hasattr(settings, key) and getattr(settings, key) != value:
             setattr(settings, key, value)
+            changed = True
 
-    save_settings()
+    if changed:
+        save_settings()
     return settings
 
 
@@ -7,8 +7,9 @@ import json
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional, Any
+from typing import Any, Dict, Optional
 import asyncio
+import threading
 from functools import wraps
 
 logger = logging.getLogger(__name__)
@@ -19,6 +20,18 @@ USER_DATA_FILE = Path(__file__).parent.parent / "data" / "bot_users.json"
 # Lock for thread-safe file operations
 _file_lock = asyncio.Lock()
 
+# Guards read-modify-write of the user file (the activity worker writes from a thread)
+_data_lock = threading.RLock()
+
+
+def _with_data_lock(func):
+    """Run func while holding the user data lock."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with _data_lock:
+            return func(*args, **kwargs)
+    return wrapper
+
 
 def ensure_data_file_exists() -> None:
     """Create bot_users.json if it doesn't exist."""
@@ -26,9 +39,10 @@ def ensure_data_file_exists() -> None:
     if not USER_DATA_FILE.exists():
         with open(USER_DATA_FILE, "w", encoding="utf-8") as f:
             json.dump({}, f, ensure_ascii=False, indent=2)
-        logger.info(f"Created user data file: {USER_DATA_FILE}")
+        logger.info("Created user data file: %s", USER_DATA_FILE)
 
 
+@_with_data_lock
 def load_all_users() -> Dict[str, Any]:
     """
     Load all user data from file.
@@ -41,10 +55,11 @@ def load_all_users() -> Dict[str, Any]:
         with open(USER_DATA_FILE, "r", encoding="utf-8") as f:
             return json.load(f)
     except (json.JSONDecodeError, FileNotFoundError) as e:
-        logger.error(f"Error loading user data: {e}")
+        logger.error("Error loading user data: %s", e)
         return {}
 
 
+@_with_data_lock
 def save_all_users(data: Dict[str, Any]) -> None:
     """
     Save all user data to file.
@@ -57,7 +72,7 @@ def save_all_users(data: Dict[str, Any]) -> None:
         with open(USER_DATA_FILE, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
     except Exception as e:
-        logger.error(f"Error saving user data: {e}", exc_info=True)
+        logger.error("Error saving user data: %s", e, exc_info=True)
 
 
 def load_user_data(user_id: int) -> Optional[Dict[str, Any]]:
@@ -74,6 +89,7 @@ def load_user_data(user_id: int) -> Optional[Dict[str, Any]]:
     return all_users.get(str(user_id))
 
 
+@_with_data_lock
 def save_user_data(user_id: int, data: Dict[str, Any]) -> None:
     """
     Save data for a specific user.
@@ -87,6 +103,7 @@ def save_user_data(user_id: int, data: Dict[str, Any]) -> None:
     save_all_users(all_users)
 
 
+@_with_data_lock
 def update_user_activity(
     user_id: int,
     first_name: str = None,
@@ -121,7 +138,7 @@ def update_user_activity(
             "posts_triggered": 0,
             "actions_log": []
         }
-        logger.info(f"New user registered: {user_id} ({first_name})")
+        logger.info("New user registered: %s (%s)", user_id, first_name)
     else:
         # Update existing user
         user_data["last_active"] = now
@@ -145,6 +162,7 @@ def update_user_activity(
     return user_data
 
 
+@_with_data_lock
 def increment_posts_triggered(user_id: int) -> None:
     """
     Increment the posts_triggered counter for a user.
@@ -158,6 +176,169 @@ def increment_posts_triggered(user_id: int) -> None:
         save_user_data(user_id, user_data)
 
 
+# ============================================
+# BACKGROUND ACTIVITY WRITER
+# ============================================
+
+# Seconds between flushes of buffered activity to disk
+ACTIVITY_FLUSH_INTERVAL = 5
+
+# Number of buffered users that triggers an early flush
+ACTIVITY_FLUSH_SIZE = 100
+
+# Pending activity per user, merged and written in one batch per flush
+_activity_buffer: Dict[int, Dict[str, Any]] = {}
+_activity_worker: Optional[asyncio.Task] = None
+_flush_event: Optional[asyncio.Event] = None
+
+
+def _pending_activity(user_id: int) -> Dict[str, Any]:
+    """Get or create the buffered activity entry for a user."""
+    pending = _activity_buffer.get(user_id)
+    if pending is None:
+        pending = {
+            "first_name": None,
+            "username": None,
+            "commands": 0,
+            "last_active": None,
+            "actions": [],
+            "posts_triggered": 0
+        }
+        _activity_buffer[user_id] = pending
+    return pending
+
+
+@_with_data_lock
+def _apply_activity_batch(batch: Dict[int, Dict[str, Any]]) -> None:
+    """Merge buffered activity into the user file with a single load and save."""
+    all_users = load_all_users()
+    
+    for user_id, pending in batch.items():
+        key = str(user_id)
+        user_data = all_users.get(key)
+        
+        if user_data is None:
+            # posts_triggered alone never creates a user (same as increment_posts_triggered)
+            if not pending["commands"]:
+                continue
+            user_data = {
+                "first_name": pending["first_name"] or "Unknown",
+                "username": pending["username"] or "",
+                "first_seen": pending["last_active"],
+                "last_active": pending["last_active"],
+                "total_commands": 0,
+                "posts_triggered": 0,
+                "actions_log": []
+            }
+            logger.info("New user registered: %s (%s)", user_id, pending['first_name'])
+        
+        if pending["commands"]:
+            user_data["last_active"] = pending["last_active"]
+            user_data["total_commands"] = user_data.get("total_commands", 0) + pending["commands"]
+            if pending["first_name"]:
+                user_data["first_name"] = pending["first_name"]
+            if pending["username"]:
+                user_data["username"] = pending["username"]
+        
+        if pending["actions"]:
+            actions_log = user_data.get("actions_log", []) + pending["actions"]
+            # Keep only last 50 actions
+            user_data["actions_log"] = actions_log[-50:]
+        
+        if pending["posts_triggered"]:
+            user_data["posts_triggered"] = user_data.get("posts_triggered", 0) + pending["posts_triggered"]
+        
+        all_users[key] = user_data
+    
+    save_all_users(all_users)
+
+
+async def _flush_activity() -> None:
+    """Write out everything buffered so far, off the event loop."""
+    global _activity_buffer
+    if not _activity_buffer:
+        return
+    batch, _activity_buffer = _activity_buffer, {}
+    try:
+        await asyncio.to_thread(_apply_activity_batch, batch)
+    except Exception as e:
+        logger.error("Error writing user activity: %s", e, exc_info=True)
+
+
+def _schedule_flush() -> None:
+    """Write immediately if the worker isn't running, else flush early when the buffer is large."""
+    global _activity_buffer
+    if _activity_worker is None:
+        batch, _activity_buffer = _activity_buffer, {}
+        _apply_activity_batch(batch)
+    elif len(_activity_buffer) >= ACTIVITY_FLUSH_SIZE:
+        _flush_event.set()
+
+
+async def _activity_worker_loop() -> None:
+    """Flush buffered activity every ACTIVITY_FLUSH_INTERVAL seconds (or early on demand)."""
+    while True:
+        try:
+            await asyncio.wait_for(_flush_event.wait(), timeout=ACTIVITY_FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        _flush_event.clear()
+        await _flush_activity()
+
+
+def track_user_activity(
+    user_id: int,
+    first_name: str = None,
+    username: str = None,
+    action: str = None
+) -> None:
+    """Record user activity in the write buffer (non-blocking update_user_activity)."""
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    pending = _pending_activity(user_id)
+    pending["commands"] += 1
+    pending["last_active"] = now
+    if first_name:
+        pending["first_name"] = first_name
+    if username:
+        pending["username"] = username
+    if action:
+        pending["actions"].append({"action": action, "timestamp": now})
+        del pending["actions"][:-50]
+    _schedule_flush()
+
+
+def track_posts_triggered(user_id: int) -> None:
+    """Increment posts_triggered in the write buffer (non-blocking)."""
+    _pending_activity(user_id)["posts_triggered"] += 1
+    _schedule_flush()
+
+
+def start_activity_worker() -> None:
+    """Start the periodic activity flusher (call from bot startup)."""
+    global _activity_worker, _flush_event
+    if _activity_worker is not None:
+        return
+    _flush_event = asyncio.Event()
+    _activity_worker = asyncio.create_task(_activity_worker_loop())
+    logger.info("Activity writer started")
+
+
+async def stop_activity_worker() -> None:
+    """Stop the flusher and write out any remaining buffered activity."""
+    global _activity_worker, _flush_event
+    if _activity_worker is None:
+        return
+    _activity_worker.cancel()
+    try:
+        await _activity_worker
+    except asyncio.CancelledError:
+        pass
+    _activity_worker = None
+    _flush_event = None
+    await _flush_activity()
+    logger.info("Activity writer stopped")
+
+
 def get_user_stats(user_id: int) -> Optional[Dict[str, Any]]:
     """
     Get user statistics.
@@ -1,13 +1,19 @@
 """
 Utils package for Utro Bot.
-Contains logging and helper utilities.
+Contains logging, throttling and caching helpers.
 """
 
 from .logger import mask_sensitive, mask_user_id, mask_channel_id, get_safe_log_message
+from .throttle import TTLThrottle, denial_throttle
+from .image_cache import DiskImageCache, test_image_cache
 
 __all__ = [
     "mask_sensitive",
     "mask_user_id", 
     "mask_channel_id",
-    "get_safe_log_message"
+    "get_safe_log_message",
+    "TTLThrottle",
+    "denial_throttle",
+    "DiskImageCache",
+    "test_image_cache"
 ]
@@ -0,0 +1,117 @@
+"""
+Image cache for Utro Bot.
+Keeps generated images on disk so repeat generations of the same
+(model, prompt) pair don't hit the paid image API again.
+"""
+
+import hashlib
+import logging
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DiskImageCache:
+    """
+    Stores image bytes as files keyed by a hash of (model, prompt).
+
+    When the directory grows past `max_bytes`, the least recently used
+    files (by access time) are removed until it fits again.
+    lookup() and put() do blocking file I/O; call them from async code
+    via asyncio.to_thread().
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        """
+        Initialize cache.
+
+        Args:
+            directory: Folder for cached images (created on first write)
+            max_bytes: Total size of cached files that triggers eviction
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(model: str, prompt: str) -> str:
+        """Build a stable cache key for an image model and prompt."""
+        return hashlib.sha1(f"{model}|{prompt}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.jpg"
+
+    def lookup(self, key: str) -> Optional[Path]:
+        """
+        Find a cached image.
+
+        The file is returned by path so it can be streamed (e.g. with
+        FSInputFile) instead of being read into memory on the event loop.
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            Path to the image or None if not cached
+        """
+        path = self._path(key)
+        if not path.is_file():
+            return None
+        try:
+            # Refresh access time explicitly (noatime mounts don't update it)
+            path.touch()
+        except OSError as e:
+            logger.warning("Failed to touch cached image %s: %s", path.name, e)
+        return path
+
+    def put(self, key: str, data: bytes) -> Optional[Path]:
+        """
+        Save an image and evict old entries if the cache is over size.
+
+        Args:
+            key: Key from make_key()
+            data: Image bytes
+
+        Returns:
+            Path to the saved image or None if it could not be written
+        """
+        path = self._path(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+            self._evict()
+        except OSError as e:
+            logger.warning("Failed to cache image: %s", e)
+            return None
+        # An image larger than max_bytes is evicted right away
+        return path if path.is_file() else None
+
+    def _evict(self) -> None:
+        """Remove least recently used files until the cache fits max_bytes."""
+        entries = []
+        total = 0
+        for path in self.directory.glob("*.jpg"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                # Removed by a concurrent eviction in another thread
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+            total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            path.unlink(missing_ok=True)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+# Cached neural test images (fixed prompt, so repeat runs are pure API cost)
+TEST_IMAGE_CACHE_DIR = Path(__file__).parent.parent / "data" / "cache" / "test_images"
+TEST_IMAGE_CACHE_MAX_BYTES = 20 * 1024 * 1024
+
+test_image_cache = DiskImageCache(TEST_IMAGE_CACHE_DIR, TEST_IMAGE_CACHE_MAX_BYTES)
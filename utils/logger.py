@@ -4,6 +4,7 @@ Contains functions for masking sensitive data in logs.
 """
 
 import re
+from functools import lru_cache
 from typing import Optional
 
 
@@ -57,6 +58,8 @@ def mask_sensitive(text: str, debug_mode: bool = False) -> str:
     return result
 
 
+# Masked IDs are pure functions of (id, debug_mode); cache them for hot log paths
+@lru_cache(maxsize=4096)
 def mask_user_id(user_id: int, debug_mode: bool = False) -> str:
     """
     Mask a user ID for logging.
@@ -78,6 +81,7 @@ def mask_user_id(user_id: int, debug_mode: bool = False) -> str:
     return f"user_***{user_str[-3:]}"
 
 
+@lru_cache(maxsize=4096)
 def mask_channel_id(channel_id: str, debug_mode: bool = False) -> str:
     """
     Mask a channel ID for logging.
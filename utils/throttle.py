@@ -0,0 +1,62 @@
+"""
+Throttling utilities for Utro Bot.
+Contains a small in-memory TTL throttle for per-user notifications.
+"""
+
+import time
+from typing import Dict, Hashable
+
+
+class TTLThrottle:
+    """
+    Allows an action at most once per `ttl` seconds for each key.
+
+    Used to stop unauthorized users from spending the bot's Telegram
+    rate limit (and log volume) by spamming commands or buttons.
+    """
+
+    def __init__(self, ttl: float, max_size: int = 10000):
+        """
+        Initialize throttle.
+
+        Args:
+            ttl: Seconds during which repeat actions for a key are suppressed
+            max_size: Number of tracked keys that triggers pruning of expired ones
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._last_seen: Dict[Hashable, float] = {}
+
+    def allow(self, key: Hashable) -> bool:
+        """
+        Check whether the action for `key` should go through now.
+
+        Args:
+            key: Throttle key (e.g. Telegram user ID)
+
+        Returns:
+            True if allowed (and records it), False if still throttled
+        """
+        now = time.monotonic()
+        last = self._last_seen.get(key)
+        if last is not None and now - last < self.ttl:
+            return False
+
+        if len(self._last_seen) >= self.max_size:
+            self._prune(now)
+        self._last_seen[key] = now
+        return True
+
+    def _prune(self, now: float) -> None:
+        """Drop keys whose throttle window has expired."""
+        self._last_seen = {
+            key: ts for key, ts in self._last_seen.items()
+            if now - ts < self.ttl
+        }
+
+
+# Seconds between access-denied replies to the same user
+DENIAL_TTL = 60
+
+# Shared across handler modules so each user gets one denial per window
+denial_throttle = TTLThrottle(DENIAL_TTL)